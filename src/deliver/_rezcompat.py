@@ -0,0 +1,164 @@
+"""Rez internals that developer package loading relies on
+
+`DeveloperPackage.from_path` loads package definition file and then
+finishes the package (expands requirements, runs preprocess function...).
+Loaded definitions are cached by rez-deliver, so the two steps are done
+separately here, which needs private parts of rez. So does probing version
+of git-versioned package, where only the `version` function is run.
+
+Private parts are only used on tested rez version and if all of them are
+present, see `SUPPORTED`. Otherwise, packages are finished by calling
+`DeveloperPackage.from_path`, which loads the definition file again, and
+versions are not probed. Slower, but still correct.
+
+"""
+import os
+import types
+
+import rez
+from rez import serialise
+from rez.serialise import FileFormat, load_from_file
+from rez.config import config as rezconfig
+from rez.developer_package import DeveloperPackage
+from rez.exceptions import PackageMetadataError
+from rez.packages import create_package
+from rez.vendor.version.version import Version
+
+from deliver.lib import temp_env
+from deliver.cache import include_names
+
+
+# rez versions that private parts are tested with, lower inclusive
+TESTED_REZ_VERSIONS = (Version("2.114"), Version("3"))
+
+_PRIVATE_PARTS = [
+    (DeveloperPackage, "_get_preprocessed"),
+    (DeveloperPackage, "_validate_includes"),
+    (serialise, "ScopeContext"),
+    (serialise, "EarlyThis"),
+    (serialise, "add_sys_paths"),
+    (serialise, "get_objects"),
+]
+
+
+def _is_supported():
+    lower, upper = TESTED_REZ_VERSIONS
+    if not lower <= Version(rez.__version__) < upper:
+        return False
+    return all(hasattr(obj, attr) for obj, attr in _PRIVATE_PARTS)
+
+
+SUPPORTED = _is_supported()
+
+
+def load_package_file(filepath):
+    """Load developer package definition file without validating it
+
+    Returns:
+        dict: package data with early bound attributes computed
+
+    """
+    if os.path.splitext(filepath)[1] == "." + FileFormat.yaml.extension:
+        format_ = FileFormat.yaml
+    else:
+        format_ = FileFormat.py
+    return load_from_file(filepath, format_, disable_memcache=True)
+
+
+def developer_package(filepath, definition):
+    """Create `DeveloperPackage` from loaded package definition data
+
+    This does what `DeveloperPackage.from_path` does after the definition
+    file is loaded. Requirements like "foo-*" are expanded, and the package
+    is preprocessed, against current package paths and system.
+
+    Must be called within package directory, and with payload version set
+    in environment if it's git-versioned.
+
+    Args:
+        filepath (str): package definition file path
+        definition (dict): data returned from `load_package_file`
+
+    Returns:
+        `DeveloperPackage`
+
+    """
+    if not SUPPORTED:
+        return DeveloperPackage.from_path(os.path.dirname(filepath))
+
+    data = dict(definition)
+    name = data.get("name")
+    if not isinstance(name, str):
+        raise PackageMetadataError(
+            "Error in %r - missing or non-string field 'name'" % filepath)
+
+    package = create_package(name, data, package_cls=DeveloperPackage)
+    package.filepath = filepath
+
+    result = package._get_preprocessed(data)
+    if result:
+        package, data = result
+    package.filepath = filepath
+
+    package.includes = include_names(data)
+    package._validate_includes()
+
+    return package
+
+
+def version_prober(filepath):
+    """Return a function that computes version from git tag cheaply
+
+    Instead of evaluating the whole package, only the `version` attribute
+    is computed with given payload version. This is done by executing the
+    package definition without processing any other early bound
+    attribute.
+
+    Must be called within package directory.
+
+    Returns:
+        callable: takes payload version and returns package version
+            string, or None if version cannot be probed.
+
+    """
+    def no_probe(_):
+        return None
+
+    if not SUPPORTED:
+        return no_probe
+
+    g = dict(scope=serialise.ScopeContext(),
+             early=serialise.early,
+             late=serialise.late,
+             include=serialise.include,
+             ModifyList=serialise.ModifyList,
+             InvalidPackageError=serialise.InvalidPackageError)
+    try:
+        build_paths = rezconfig.package_definition_build_python_paths
+        with serialise.add_sys_paths(build_paths), \
+                open(filepath, "rb") as f:
+            exec(compile(f.read(), filepath, "exec"), g)
+    except Exception:
+        return no_probe
+
+    func = g.get("version")
+    if not (isinstance(func, types.FunctionType)
+            and hasattr(func, "_early")):
+        return no_probe
+
+    def probe(ver_tag):
+        fn = types.FunctionType(func.__code__,
+                                func.__globals__.copy(),
+                                name=func.__name__,
+                                argdefs=func.__defaults__,
+                                closure=func.__closure__)
+        fn.__globals__["this"] = serialise.EarlyThis(g)
+        fn.__globals__.update(serialise.get_objects())
+        try:
+            with temp_env("REZ_DELIVER_PKG_PAYLOAD_VER", ver_tag):
+                version = fn()
+            return str(Version(version))
+        except Exception:
+            return None
+
+    return probe
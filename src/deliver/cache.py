@@ -0,0 +1,215 @@
+"""On-disk caches that survive between sessions and processes
+
+All caches live under the `cache_root` directory of rez-deliver config, each
+in its own sub-directory, default "~/.cache/rez-deliver". If `cache_root` is
+set to None, persistent caching is disabled and every cache lookup is a miss.
+
+    # rezconfig.py
+    plugins = {
+        "command": {
+            "deliver": {
+                "cache_root": "/studio/cache/rez-deliver",
+    }}}
+
+"""
+import os
+import time
+import pickle
+import hashlib
+import tempfile
+
+from rez.config import config as rezconfig
+from rez.utils.sourcecode import SourceCode
+
+from deliver.lib import expand_path
+
+
+def file_hash(filepath):
+    """Return sha1 hex digest of file content, or None if file not exists"""
+    try:
+        with open(filepath, "rb") as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    except (IOError, OSError):
+        return None
+
+
+def include_names(data):
+    """Return names of `@include` modules that used in package data"""
+    names = set()
+
+    def visit(d):
+        for value in d.values():
+            if isinstance(value, SourceCode):
+                names.update(value.includes or set())
+            elif isinstance(value, dict):
+                visit(value)
+
+    visit(data)
+    return names
+
+
+def include_paths(names):
+    """Return file paths of `@include` modules"""
+    include_path = rezconfig.package_definition_python_path or ""
+    return [os.path.join(include_path, name + ".py") for name in names]
+
+
+def include_hashes(names):
+    """Return include module file path to content hash mapping"""
+    return {path: file_hash(path) for path in include_paths(names)}
+
+
+def cache_dir(name):
+    """Return cache sub-directory path of given name, or None if disabled"""
+    deliverconfig = rezconfig.plugins.command.deliver
+    root = deliverconfig.get("cache_root")
+    if not root:
+        return None
+    return os.path.join(expand_path(root), name)
+
+
+class DiskCache(object):
+    """A pickle file based key-value store
+
+    Each entry is saved into its own file that named by the hash of the key,
+    and is written atomically so multiple processes can share the same cache
+    directory.
+
+    Args:
+        root (str): Cache directory path, caching is disabled if None.
+        ttl (int or float, optional): Time-to-live in seconds, entries that
+            are older than this will be treated as missing.
+
+    """
+
+    def __init__(self, root, ttl=None):
+        self._root = root
+        self._ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return bool(self._root)
+
+    @property
+    def root(self):
+        return self._root
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+    def _entry_path(self, key):
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(self._root, digest[:2], digest + ".pkl")
+
+    def get(self, key, default=None):
+        """Return cached value of `key`, or `default` on miss"""
+        if not self._root:
+            self.misses += 1
+            return default
+
+        filepath = self._entry_path(key)
+        try:
+            if self._ttl is not None:
+                if time.time() - os.path.getmtime(filepath) > self._ttl:
+                    raise OSError("Cache entry expired.")
+
+            with open(filepath, "rb") as f:
+                stored_key, value = pickle.load(f)
+
+        except Exception:
+            self.misses += 1
+            return default
+
+        if stored_key != key:  # hash collision
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        """Save value of `key`, silently skip if value is not picklable"""
+        if not self._root:
+            return
+
+        filepath = self._entry_path(key)
+        dirpath = os.path.dirname(filepath)
+        try:
+            if not os.path.isdir(dirpath):
+                os.makedirs(dirpath, exist_ok=True)
+            content = pickle.dumps((key, value))
+        except Exception:
+            return
+
+        fd, tmp = tempfile.mkstemp(dir=dirpath, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(tmp, filepath)
+        except Exception:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def discard(self, key):
+        if not self._root:
+            return
+        try:
+            os.remove(self._entry_path(key))
+        except OSError:
+            pass
+
+
+class PackageDataCache(DiskCache):
+    """Cache of loaded developer package definitions
+
+    Entries are keyed by package file path, its content hash and the payload
+    version tag (for git-versioned package). Hashes of `@include` modules are
+    stored alongside with data, and validated on lookup.
+
+    Cached data is taken before requirements are expanded, since expanding
+    requirements like "foo-*" depends on what packages are available at the
+    time, not on the definition file.
+
+    """
+
+    def __init__(self, root):
+        super(PackageDataCache, self).__init__(root)
+
+    def get_data(self, filepath, ver_tag=None):
+        """Return cached definition data, or None if missing or outdated"""
+        if not self._root:
+            self.misses += 1
+            return None
+
+        key = (filepath, file_hash(filepath), ver_tag)
+        entry = self.get(key)
+        if entry is None:
+            return None
+
+        includes, data = entry
+        for path, digest in includes.items():
+            if file_hash(path) != digest:
+                # counted as hit in `get`, correct it
+                self.hits -= 1
+                self.misses += 1
+                return None
+
+        return data
+
+    def set_data(self, filepath, data, includes=None, ver_tag=None):
+        """Save loaded package definition data
+
+        Args:
+            filepath (str): package definition file path
+            data (dict): loaded package definition data
+            includes (set, optional): Names of `@include` modules
+            ver_tag (str, optional): Payload version from git tag
+
+        """
+        if not self._root:
+            return
+
+        key = (filepath, file_hash(filepath), ver_tag)
+        self.set(key, (include_hashes(includes or []), data))
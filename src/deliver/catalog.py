@@ -0,0 +1,168 @@
+"""Pre-built catalog of evaluated developer packages
+
+A catalog file is written into developer package repository root by
+`rez deliver --build-catalog` (e.g. in CI), which holds loaded package
+definitions of every family, along with content hashes of package definition
+files and their `@include` modules. `PackageLoader` reads the catalog instead
+of executing package.py whenever the hashes still match.
+
+Definitions are catalogued before requirements get expanded, so requires
+like "foo-*" or "os-*" are still expanded on the machine that reads the
+catalog, with its own package paths and system. For the same reason, source
+files are recorded relative to the repository root, and `@include` modules
+by name.
+
+"""
+import os
+import pickle
+import tempfile
+
+from deliver.cache import file_hash, include_names, include_paths
+
+
+CATALOG_FILENAME = ".rez-deliver-catalog"
+CATALOG_FORMAT = 2
+
+
+def _include_hashes(names):
+    """Return include module name to content hash mapping"""
+    return {name: file_hash(path)
+            for name, path in zip(names, include_paths(names))}
+
+
+class Catalog(object):
+    """Catalog file of one developer package repository
+
+    Args:
+        root (str): developer package repository root
+
+    """
+
+    def __init__(self, root):
+        self._root = root
+        self._families = None
+
+    @property
+    def filepath(self):
+        return os.path.join(self._root, CATALOG_FILENAME)
+
+    def _load(self):
+        if self._families is not None:
+            return self._families
+
+        self._families = dict()
+        try:
+            with open(self.filepath, "rb") as f:
+                content = pickle.load(f)
+        except Exception:
+            return self._families
+
+        if content.get("format") == CATALOG_FORMAT:
+            self._families = content["families"]
+
+        return self._families
+
+    def get_definitions(self, family, sorted_ver_tags):
+        """Return catalogued definitions of family if still up to date
+
+        Args:
+            family (`PackageFamily`): developer package family
+            sorted_ver_tags (callable): takes git url and returns current
+                version tags, for validating git-versioned packages.
+
+        Returns:
+            list: (package file path, version tag, definition data) tuples,
+                or None if the family is not catalogued or outdated.
+
+        """
+        entry = self._load().get(family.name)
+        if entry is None:
+            return None
+
+        sources = entry["sources"]
+        filepaths = [p.uri for p in family.iter_packages() if p.uri]
+        if len(filepaths) != len(sources):
+            return None
+
+        for filepath in filepaths:
+            relpath = os.path.relpath(filepath, self._root)
+            source = sources.get(relpath)
+            if source is None or source["hash"] != file_hash(filepath):
+                return None
+            if _include_hashes(list(source["includes"])) \
+                    != source["includes"]:
+                return None
+            git_url = source["git_url"]
+            if git_url and sorted_ver_tags(git_url) != source["ver_tags"]:
+                return None
+
+        return [
+            (os.path.join(self._root, relpath), ver_tag, definition)
+            for relpath, ver_tag, definition in entry["definitions"]
+        ]
+
+    def get_git_url(self, filepath):
+        """Return catalogued git url of package file if still up to date
+
+        Args:
+            filepath (str): package definition file path
+
+        Returns:
+            str: git url, empty string if the package is not git-versioned,
+                or None if the file is not catalogued or outdated.
+
+        """
+        relpath = os.path.relpath(filepath, self._root)
+        entry = self._load().get(relpath.split(os.sep)[0])
+        if entry is None:
+            return None
+
+        source = entry["sources"].get(relpath)
+        if source is None or source["hash"] != file_hash(filepath):
+            return None
+        return source["git_url"] or ""
+
+    def write(self, families):
+        """Write catalog file
+
+        Args:
+            families (dict): family name to a list of (package file path,
+                version tag, definition data) tuples.
+
+        """
+        entries = dict()
+        for name, definitions in families.items():
+            sources = dict()
+            catalogued = list()
+
+            for filepath, ver_tag, definition in definitions:
+                relpath = os.path.relpath(filepath, self._root)
+
+                source = sources.get(relpath)
+                if source is None:
+                    source = sources[relpath] = {
+                        "hash": file_hash(filepath),
+                        "includes": dict(),
+                        "git_url": definition.get("git_url"),
+                        "ver_tags": [],
+                    }
+                source["includes"].update(
+                    _include_hashes(sorted(include_names(definition))))
+                if ver_tag:
+                    source["ver_tags"].append(ver_tag)
+
+                catalogued.append((relpath, ver_tag, definition))
+
+            entries[name] = {"sources": sources, "definitions": catalogued}
+
+        content = pickle.dumps({"format": CATALOG_FORMAT, "families": entries})
+        fd, tmp = tempfile.mkstemp(dir=self._root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(tmp, self.filepath)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+        self._families = entries
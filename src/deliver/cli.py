@@ -1,5 +1,5 @@
 
-from deliver import api
+from deliver import api, profiler
 
 
 def list_developer_packages(requests=None):
@@ -15,6 +15,7 @@ def list_developer_packages(requests=None):
 
     else:
         requests = [PackageRequest(r) for r in requests]
+        loader.prefetch_git_tags()
 
         names = list()
         for request in requests:
@@ -33,12 +34,48 @@ def list_developer_packages(requests=None):
                     print(package.qualified_name)
 
 
-def deploy_packages(requests, path, dry_run=False, yes=False):
+def build_catalog():
+    loader = api.PackageLoader()
+
+    for path in loader.build_catalog():
+        print("Catalog written: %s" % path)
+
+
+def deploy_packages(requests, path, dry_run=False, yes=False,
+                    expand_installed=False, combined_solve=False,
+                    profile=False, profile_json=None):
+    """Resolve requests, list out deploy plan and deploy if confirmed
+
+    Args:
+        profile (bool, optional): Profile deploy planning and print summary.
+        profile_json (str, optional): Profile deploy planning and also write
+            JSON report to this file path.
+
+    """
+    profile = profile or bool(profile_json)
+    if profile:
+        profiler.enable()
 
     installer = api.PackageInstaller()
+    installer.stop_at_installed = not expand_installed
+    installer.combined_solve = combined_solve
     installer.deploy_to(path)
 
-    installer.resolve(*requests)
+    try:
+        installer.resolve(*requests)
+    finally:
+        if profile:
+            prof = profiler.disable()
+            prof.print_summary()
+            if profile_json:
+                prof.write_json(profile_json)
+                print("Profile report written: %s" % profile_json)
+
+    stats = installer.context_cache_stats()
+    solves = stats["hits"] + stats["misses"]
+    if solves:
+        print("Build contexts: %d solved, %d reused (%d%% hit rate)"
+              % (stats["misses"], stats["hits"], 100 * stats["hits"] / solves))
 
     manifest = installer.manifest()
 
@@ -4,6 +4,7 @@ from rez.config import config as rezconfig
 from .vendor.Qt5 import QtCore
 from . import model, util
 from .. import api
+from ..watch import LoaderWatcher
 
 
 class State(dict):
@@ -69,6 +70,7 @@ class Controller(QtCore.QObject):
 
         timers = {
             "packageSearch": QtCore.QTimer(self),
+            "sourceWatch": QtCore.QTimer(self),
         }
 
         models_ = {
@@ -78,10 +80,13 @@ class Controller(QtCore.QObject):
         }
 
         timers["packageSearch"].timeout.connect(self.on_package_searched)
+        timers["sourceWatch"].timeout.connect(self.on_source_watched)
+        timers["sourceWatch"].start(2000)
 
         self._state = state
         self._timers = timers
         self._models = models_
+        self._watcher = LoaderWatcher(state["loader"])
 
     @property
     def state(self):  # state is also like a model and good to be exposed
@@ -98,6 +103,13 @@ class Controller(QtCore.QObject):
 
     def on_package_searched(self):
         self._models["pkgBook"].reset(self.iter_dev_packages())
+        self._watcher.sync()
+
+    def on_source_watched(self):
+        # re-list packages if any loaded developer package changed
+        if self._watcher.poll():
+            self._state["installer"].reset()  # full resolve on next manifest
+            self.defer_search_packages()
 
     def on_target_changed(self, path):
         installer = self._state["installer"]
@@ -119,6 +131,7 @@ class Controller(QtCore.QObject):
 
     def iter_dev_packages(self):
         loader = self._state["loader"]
+        loader.preload()
         seen = dict()
 
         for family in loader.iter_package_families():
@@ -152,6 +165,4 @@ class Controller(QtCore.QObject):
 
     def resolve_requests(self):
         installer = self._state["installer"]
-        installer.reset()
-        for name, index in self._models["pkgBook"].iter_requests():
-            installer.resolve_one(name, index=index)
+        installer.update(self._models["pkgBook"].iter_requests())
@@ -20,7 +20,7 @@ class PackageInstaller(RequestSolver):
     def run_iter(self):
         deliverconfig = rezconfig.plugins.command.deliver
 
-        for requested in self._requirements:
+        for requested in self._requirements.values():
             if requested.status != self.Ready:
                 # TODO: prompt warning if the status is `ResolveFailed`
                 continue
@@ -2,6 +2,7 @@
 import os
 import functools
 from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
 from rez.config import config as rezconfig
 from rez.package_repository import package_repository_manager
 
@@ -69,3 +70,107 @@ def expand_path(path):
     )
 
     return path
+
+
+def path_stamps(paths, name):
+    """Return modification times of package paths and their `name` family
+
+    Family added/removed changes the mtime of repository root, version
+    added/removed changes the mtime of family directory, and variant added
+    changes the mtime of version directory or its package definition file.
+
+    """
+    stamps = []
+    for path in paths:
+        if path.startswith("memory@"):
+            path = path[len("memory@"):]  # developer package repository
+        family_path = os.path.join(path, name)
+        for dirpath in (path, family_path):
+            stamps.append(_mtime(dirpath))
+
+        try:
+            versions = sorted(os.listdir(family_path))
+        except OSError:
+            continue
+        for version in versions:
+            version_path = os.path.join(family_path, version)
+            stamps.append((version,
+                           _mtime(version_path),
+                           _mtime(os.path.join(version_path, "package.py")),
+                           _mtime(os.path.join(version_path, "package.yaml"))))
+    return tuple(stamps)
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class ProcessPool(object):
+    """Process pool that is started on first use and skips failed jobs
+
+    Jobs that failed in worker process are left out of the results, so the
+    caller can do them again in current process, where errors get raised as
+    usual. On platforms where process pool is not available, no job is run
+    and nothing is returned.
+
+    Example:
+        >>> with ProcessPool(workers=4) as pool:
+        ...     for key, result in pool.run(func, {"a": (1,), "b": (2,)}):
+        ...         print(key, result)
+
+    """
+
+    def __init__(self, workers):
+        self._workers = workers
+        self._executor = None
+        self._unavailable = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+    def run(self, func, jobs):
+        """Run `func` with arguments of each job in pool
+
+        Args:
+            func (callable): picklable, module level function
+            jobs (dict): job key to argument tuple of `func`
+
+        Returns:
+            list: (job key, result) of jobs that succeeded, in job order
+
+        """
+        if self._unavailable or not jobs:
+            return []
+
+        try:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self._workers)
+            futures = [
+                (key, self._executor.submit(func, *args))
+                for key, args in jobs.items()
+            ]
+        except (OSError, ImportError, NotImplementedError):
+            # process pool is not available on this platform
+            self._unavailable = True
+            self.shutdown()
+            return []
+
+        results = []
+        for key, future in futures:
+            try:
+                results.append((key, future.result()))
+            except Exception:
+                continue
+        return results
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
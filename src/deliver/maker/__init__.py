@@ -0,0 +1,87 @@
+"""Registry of package makers, like rez-bind
+
+A maker is a function that takes `release` keyword argument and returns a
+`rez.package_maker.PackageMaker`, which also has `__install__` function for
+deploying the package. Makers are registered by family name with the source
+of the function in "module:function" form, and only get imported when that
+family is requested, so listing maker families costs nothing. Listing their
+versions still runs the makers, since a maker computes the version along with
+the rest of the package. A maker that cannot be imported is reported and
+treated as not registered.
+
+Other than the built-in makers, additional makers can be registered by
+entry points of group "rez_deliver.makers":
+
+    # setup.cfg
+    [options.entry_points]
+    rez_deliver.makers =
+        maya = studio_makers.maya:pkg_maya
+
+or in rez-deliver config, which overrides built-in and entry point makers,
+and a maker can be disabled by setting it to None:
+
+    # rezconfig.py
+    plugins = {
+        "command": {
+            "deliver": {
+                "package_makers": {
+                    "maya": "studio_makers.maya:pkg_maya",
+                    "rez": None,
+                },
+    }}}
+
+"""
+import importlib
+
+from rez.config import config as rezconfig
+
+
+ENTRY_POINT_GROUP = "rez_deliver.makers"
+
+BUILTIN_MAKERS = {
+    "os": "deliver.maker.os:pkg_os",
+    "arch": "deliver.maker.arch:pkg_arch",
+    "platform": "deliver.maker.platform:pkg_platform",
+    "rez": "deliver.maker.rez:pkg_rez",
+}
+
+
+def _entry_point_makers():
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:  # py<3.8
+        return dict()
+
+    try:
+        eps = entry_points()
+        if hasattr(eps, "select"):
+            eps = eps.select(group=ENTRY_POINT_GROUP)
+        else:
+            eps = eps.get(ENTRY_POINT_GROUP, [])
+    except Exception:
+        return dict()
+
+    return {ep.name: ep.value for ep in eps}
+
+
+def maker_sources():
+    """Return family name to maker source mapping, nothing gets imported
+
+    Returns:
+        dict: family name to "module:function" string
+
+    """
+    deliverconfig = rezconfig.plugins.command.deliver
+
+    sources = dict(BUILTIN_MAKERS)
+    sources.update(_entry_point_makers())
+    sources.update(deliverconfig.get("package_makers") or {})
+
+    return {name: src for name, src in sources.items() if src}
+
+
+def load_maker(source):
+    """Import and return maker function from "module:function" source"""
+    module_name, _, attr = source.partition(":")
+    module = importlib.import_module(module_name)
+    return getattr(module, attr)
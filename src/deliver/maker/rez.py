@@ -2,6 +2,7 @@ from __future__ import absolute_import
 import re
 import os
 import shutil
+import zipfile
 import subprocess
 from tempfile import mkdtemp
 
@@ -12,38 +13,101 @@ from rez.packages import iter_packages
 from rez.config import config as rezconfig
 from rez.resolved_context import ResolvedContext
 from rez.package_maker import PackageMaker, make_package
-from rez.vendor.version.version import Version, VersionError
+from rez.vendor.version.version import Version, VersionError, VersionRange
+
+from deliver.lib import expand_path, path_stamps
+from deliver.cache import DiskCache, cache_dir
+
+
+PYPI_SIMPLE_URL = "https://pypi.org/simple"
+
+# index url -> latest rez version (or None), looked up once per session
+_rez_version_memo = dict()
 
 
 def fetch_rez_version_from_pypi():
+    """Return latest rez version string from package index, or None
+
+    The index is `rez_index_url` of rez-deliver config, which could be a
+    PyPI-like simple index URL or a local directory, default is PyPI. The
+    result is kept for the session, and in persistent cache (if enabled)
+    for `rez_version_ttl` seconds. When the index is not reachable within
+    `rez_index_timeout`, last cached version is used regardless expiry.
+
+    """
+    deliverconfig = rezconfig.plugins.command.deliver
+    index = deliverconfig.get("rez_index_url") or PYPI_SIMPLE_URL
+
+    if index in _rez_version_memo:
+        return _rez_version_memo[index]
+
+    cache = DiskCache(cache_dir("rez_version"),
+                      ttl=deliverconfig.get("rez_version_ttl"))
+    version = cache.get(index)
+
+    if version is None:
+        try:
+            names = _list_rez_index(index,
+                                    deliverconfig.get("rez_index_timeout"))
+        except (IOError, OSError, ValueError) as e:
+            print("Failed to reach rez package index %s: %s" % (index, e))
+            # stale but better than nothing
+            version = DiskCache(cache_dir("rez_version")).get(index)
+        else:
+            version = _latest_rez_version(names)
+            if version:
+                cache.set(index, version)
+            else:
+                print("Failed to parse latest rez version from %s.." % index)
+
+    _rez_version_memo[index] = version
+    return version
+
+
+def _list_rez_index(index, timeout=None):
+    """Return file names (or lines of simple index page) of rez releases"""
+    name = "rez"
+
+    dirpath = expand_path(index)
+    if os.path.isdir(dirpath):
+        # flat directory, or PEP-503 layout that has project sub-directory
+        names = os.listdir(dirpath)
+        project_dir = os.path.join(dirpath, name)
+        if os.path.isdir(project_dir):
+            names += os.listdir(project_dir)
+        return names
+
     try:
         from urllib.request import urlopen  # noqa, py3
     except ImportError:
         from urllib import urlopen  # noqa, py2
 
-    name = "rez"
+    url = "{}/{}/".format(index.rstrip("/"), name)
+    f = urlopen(url, timeout=timeout)
+    try:
+        text = f.read().decode("utf-8")
+    finally:
+        f.close()
 
-    _pypi_url = "https://pypi.python.org/simple/{}".format(name)
-    _regex_version = re.compile(".*{}-(.*)\\.tar\\.gz".format(name))
+    return text.split()
 
-    f = urlopen(_pypi_url)
-    text = f.read().decode("utf-8")
-    f.close()
 
-    latest_str = ""
-    for line in text.split():
-        result = _regex_version.search(line)
-        if result:
-            latest_str = result.group(1)
+def _latest_rez_version(names):
+    _regex_version = re.compile(".*rez-(.*)\\.tar\\.gz")
 
-    try:
-        Version(latest_str)
-    except VersionError:
-        pass
-    else:
-        return latest_str
+    latest = None
+    for line in names:
+        result = _regex_version.search(line)
+        if not result:
+            continue
+        try:
+            version = Version(result.group(1))
+        except VersionError:
+            continue
+        if latest is None or version > latest:
+            latest = version
 
-    print("Failed to parse latest rez version from PyPi..")
+    return str(latest) if latest is not None else None
 
 
 _regex_pypi_rez_ver = re.compile('.*<h1 class="package-header__name">'
@@ -51,18 +115,33 @@ _regex_pypi_rez_ver = re.compile('.*<h1 class="package-header__name">'
                                  flags=re.DOTALL)
 
 
+# package paths -> (modification stamps, python major.minor versions)
+_python_versions_index = dict()
+
+
 def find_python_package_versions(release):
+    """Return available python versions in major.minor form
+
+    Result is indexed per package path set, and only gets looked up again
+    when repository or python family directory has been modified.
+
+    """
     from deliver.api import PackageLoader
 
     python = "python"
-    versions = set()
-
     loader = PackageLoader()
 
     paths = rezconfig.nonlocal_packages_path[:] if release \
         else rezconfig.packages_path[:]
     paths += loader.paths
 
+    key = tuple(paths)
+    stamps = path_stamps(paths, python)
+    indexed = _python_versions_index.get(key)
+    if indexed is not None and indexed[0] == stamps:
+        return indexed[1][:]
+
+    versions = set()
     for package in iter_packages(python, paths=paths):
         versions.add(package.version)
 
@@ -74,7 +153,10 @@ def find_python_package_versions(release):
         if len(tokens) >= 2 and all(t.isdigit() for t in tokens):
             short_versions.add(".".join(tokens))
 
-    return sorted(short_versions)
+    short_versions = sorted(short_versions)
+    _python_versions_index[key] = (stamps, short_versions)
+
+    return short_versions[:]
 
 
 def pkg_rez(release, *_args, **_kwargs):
@@ -133,14 +215,20 @@ def pkg_rez(release, *_args, **_kwargs):
 
 
 def build_rez_via_pip(repo_path, rez_url, rez_version, python_version=None):
-    # pip install rez to temp
-    tmpdir = mkdtemp(prefix="rez-install-")
     python_exec = which("python")
+    wheelhouse = _wheelhouse()
 
-    subprocess.check_call(
-        [python_exec, "-m", "pip", "install", rez_url, "--target", tmpdir],
-        stderr=subprocess.STDOUT,
-    )
+    if wheelhouse:
+        libdir = _unpacked_rez(python_exec, rez_url, rez_version,
+                               python_version, wheelhouse)
+        tmpdir = None
+    else:
+        # pip install rez to temp
+        tmpdir = libdir = mkdtemp(prefix="rez-install-")
+        subprocess.check_call(
+            [python_exec, "-m", "pip", "install", rez_url, "--target", tmpdir],
+            stderr=subprocess.STDOUT,
+        )
 
     # make package
     def commands():
@@ -148,8 +236,9 @@ def build_rez_via_pip(repo_path, rez_url, rez_version, python_version=None):
 
     def make_root(_variant, root):
         for lib in ["rez", "rezplugins"]:
-            shutil.copytree(os.path.join(tmpdir, lib),
-                            os.path.join(root, lib))
+            shutil.copytree(os.path.join(libdir, lib),
+                            os.path.join(root, lib),
+                            copy_function=_link_or_copy)
 
     variant = system.variant[:]
     if python_version:
@@ -162,7 +251,121 @@ def build_rez_via_pip(repo_path, rez_url, rez_version, python_version=None):
         pkg.commands = commands
 
     # cleanup
+    if tmpdir:
+        try:
+            shutil.rmtree(tmpdir)
+        except Exception:
+            pass
+
+
+def _wheelhouse():
+    deliverconfig = rezconfig.plugins.command.deliver
+    wheelhouse = deliverconfig.get("wheelhouse")
+    if wheelhouse:
+        return expand_path(wheelhouse)
+    return cache_dir("wheels")
+
+
+def _unpacked_rez(python_exec, rez_url, rez_version, python_version,
+                  wheelhouse):
+    """Return directory that rez wheel is unpacked into
+
+    Rez wheel is built (downloaded) into local wheelhouse only once, and is
+    unpacked once per rez version. All variants and later deployments
+    hardlink files from there, instead of pip installing rez again.
+
+    """
+    wheel = _find_rez_wheel(wheelhouse, rez_version, python_version)
+    if wheel is None:
+        _build_rez_wheel(python_exec, rez_url, wheelhouse)
+        wheel = _find_rez_wheel(wheelhouse, rez_version, python_version)
+        if wheel is None:
+            raise Exception("Could not find rez-%s wheel in %s after build."
+                            % (rez_version, wheelhouse))
+
+    unpacked_root = os.path.join(wheelhouse, "unpacked")
+    unpacked = os.path.join(unpacked_root,
+                            os.path.splitext(os.path.basename(wheel))[0])
+    if os.path.isdir(unpacked):
+        return unpacked
+
+    # unpack into temp dir then rename, for other processes that may be
+    # unpacking the same wheel
+    os.makedirs(unpacked_root, exist_ok=True)
+    tmpdir = mkdtemp(prefix=".rez-unpack-", dir=unpacked_root)
+    try:
+        with zipfile.ZipFile(wheel) as archive:
+            archive.extractall(tmpdir)
+        try:
+            os.rename(tmpdir, unpacked)
+        except OSError:
+            if not os.path.isdir(unpacked):
+                raise
+    finally:
+        if os.path.isdir(tmpdir):
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+    return unpacked
+
+
+_regex_rez_wheel = re.compile(r"rez-([^-]+)-([^-]+)-[^-]+-[^-]+\.whl$")
+
+
+def _find_rez_wheel(wheelhouse, rez_version, python_version=None):
+    """Return latest rez wheel in `rez_version` range, or None if not found
+
+    Only wheels that are tagged for the major version of `python_version`
+    are looked up, or any wheel if `python_version` is None.
+
+    """
+    try:
+        names = os.listdir(wheelhouse)
+    except OSError:
+        return None
+
+    range_ = VersionRange(rez_version)
+    py_tag = "py" + (python_version.split(".")[0] if python_version else "")
+
+    found = []
+    for name in names:
+        result = _regex_rez_wheel.match(name)
+        if not result:
+            continue
+        try:
+            version = Version(result.group(1))
+        except VersionError:
+            continue
+        tags = result.group(2).split(".")
+        if range_.contains_version(version) \
+                and any(t.startswith(py_tag) for t in tags):
+            found.append((version, name))
+
+    if not found:
+        return None
+    return os.path.join(wheelhouse, max(found)[1])
+
+
+def _build_rez_wheel(python_exec, rez_url, wheelhouse):
+    deliverconfig = rezconfig.plugins.command.deliver
+    index = deliverconfig.get("rez_index_url")
+    if not index:
+        index_args = []
+    elif os.path.isdir(expand_path(index)):
+        index_args = ["--no-index", "--find-links", expand_path(index)]
+    else:
+        index_args = ["--index-url", index]
+
+    os.makedirs(wheelhouse, exist_ok=True)
+    subprocess.check_call(
+        [python_exec, "-m", "pip", "wheel", rez_url,
+         "--no-deps", "--wheel-dir", wheelhouse] + index_args,
+        stderr=subprocess.STDOUT,
+    )
+
+
+def _link_or_copy(src, dst):
+    """Hardlink file if on the same filesystem, copy otherwise"""
     try:
-        shutil.rmtree(tmpdir)
-    except Exception:
-        pass
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
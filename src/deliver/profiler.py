@@ -0,0 +1,171 @@
+"""Phase profiler of deploy planning
+
+Records wall time, call count and cache hits of each planning phase, like
+finding developer packages, looking up installed packages, re-evaluating
+variants, solving build-time contexts and fetching git tags, in total and
+per package.
+
+Example:
+    >>> from deliver import profiler
+    >>> prof = profiler.enable()
+    >>> installer.resolve("foo")
+    >>> profiler.disable()
+    >>> prof.print_summary()
+    >>> prof.write_json("plan-profile.json")
+
+Profiling is off by default, in which case a profiled function costs one
+extra function call and nothing is recorded. Work done in worker processes
+(e.g. `parallel_solve_workers`) is not recorded.
+
+"""
+import json
+import time
+from functools import wraps
+
+
+_active = None  # the enabled `Profiler`, or None
+
+
+def enable():
+    """Start recording into a new profiler and return it"""
+    global _active
+    _active = Profiler()
+    return _active
+
+
+def disable():
+    """Stop recording and return the profiler that was recording, if any"""
+    global _active
+    profiler, _active = _active, None
+    if profiler is not None:
+        profiler.stop()
+    return profiler
+
+
+def active():
+    return _active
+
+
+def profiled(phase, package=None):
+    """Decorator that records wall time of the function into `phase`
+
+    Args:
+        phase (str): phase name
+        package (callable, optional): Takes the same arguments as decorated
+            function and returns the package (or any subject) name that the
+            time will be attributed to.
+
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _active
+            if profiler is None:
+                return func(*args, **kwargs)
+
+            name = str(package(*args, **kwargs)) if package else None
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.record(phase, time.perf_counter() - start, name)
+
+        return wrapper
+
+    return decorator
+
+
+def hit(phase, is_hit=True):
+    """Record a cache hit (or miss) in `phase`"""
+    profiler = _active
+    if profiler is not None:
+        profiler.count(phase, is_hit)
+
+
+class Profiler(object):
+    """Recorded planning phases of one profiling session"""
+
+    def __init__(self):
+        self._start = time.perf_counter()
+        self._elapsed = None
+        # phase -> {"calls", "seconds", "hits", "misses"}
+        self._phases = dict()
+        # package -> phase -> {"calls", "seconds"}
+        self._packages = dict()
+
+    @property
+    def elapsed(self):
+        if self._elapsed is None:
+            return time.perf_counter() - self._start
+        return self._elapsed
+
+    def stop(self):
+        self._elapsed = time.perf_counter() - self._start
+
+    def _phase(self, phase):
+        stats = self._phases.get(phase)
+        if stats is None:
+            stats = self._phases[phase] = {
+                "calls": 0, "seconds": 0.0, "hits": 0, "misses": 0,
+            }
+        return stats
+
+    def record(self, phase, seconds, package=None):
+        stats = self._phase(phase)
+        stats["calls"] += 1
+        stats["seconds"] += seconds
+
+        if package is not None:
+            phases = self._packages.setdefault(package, dict())
+            stats = phases.setdefault(phase, {"calls": 0, "seconds": 0.0})
+            stats["calls"] += 1
+            stats["seconds"] += seconds
+
+    def count(self, phase, is_hit=True):
+        self._phase(phase)["hits" if is_hit else "misses"] += 1
+
+    def report(self):
+        """Return recorded data in JSON serializable dict"""
+        packages = dict()
+        for package, phases in self._packages.items():
+            packages[package] = {
+                "seconds": sum(s["seconds"] for s in phases.values()),
+                "phases": phases,
+            }
+
+        return {
+            "seconds": self.elapsed,
+            "phases": self._phases,
+            "packages": packages,
+        }
+
+    def print_summary(self, top=10):
+        """Print phases and the slowest packages, sorted by time spent
+
+        Phase times are inclusive, e.g. re-evaluating variants while solving
+        a context counts into both phases.
+
+        """
+        report = self.report()
+
+        print("\nPlanning profile (%.3fs):" % report["seconds"])
+        print("-" * 70)
+        print(" %-20s %8s %10s %8s %8s"
+              % ("phase", "calls", "seconds", "hits", "misses"))
+        phases = sorted(report["phases"].items(),
+                        key=lambda i: i[1]["seconds"], reverse=True)
+        for phase, stats in phases:
+            print(" %-20s %8d %10.3f %8d %8d"
+                  % (phase, stats["calls"], stats["seconds"],
+                     stats["hits"], stats["misses"]))
+
+        packages = sorted(report["packages"].items(),
+                          key=lambda i: i[1]["seconds"], reverse=True)
+        if packages:
+            print("\n %-40s %10s" % ("slowest packages", "seconds"))
+            for package, stats in packages[:top]:
+                print(" %-40s %10.3f" % (package, stats["seconds"]))
+
+    def write_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2, sort_keys=True)
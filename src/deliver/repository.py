@@ -1,12 +1,17 @@
 
 import os
+import sys
+import pickle
 import logging
 import subprocess
-from functools import wraps
+from functools import wraps, partial
+from collections import OrderedDict
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
 
 from rez.config import config as rezconfig
-from rez.developer_package import DeveloperPackage
 from rez.utils.logging_ import logger as rez_logger
+from rez.utils.data_utils import cached_property
 from rez.vendor.version.version import Version, VersionError
 from rez.package_repository import package_repository_manager
 from rez.packages import (
@@ -14,13 +19,30 @@ from rez.packages import (
     iter_packages,
     get_latest_package,
     get_latest_package_from_string,
+    get_package_family_from_repository,
 )
 
-from deliver.lib import expand_path, override_config, temp_env, os_chdir
-from deliver.maker.os import pkg_os
-from deliver.maker.arch import pkg_arch
-from deliver.maker.platform import pkg_platform
-from deliver.maker.rez import pkg_rez
+from deliver.lib import (
+    expand_path,
+    override_config,
+    path_stamps,
+    temp_env,
+    os_chdir,
+    ProcessPool,
+)
+from deliver.cache import (
+    DiskCache,
+    PackageDataCache,
+    cache_dir,
+    file_hash,
+    include_names,
+    include_paths,
+)
+from deliver.catalog import Catalog
+from deliver import _rezcompat
+from deliver.exceptions import RezDeliverFatalError
+from deliver.profiler import profiled, hit
+from deliver.maker import maker_sources, load_maker
 
 
 # silencing rez logger, e.g. on package preprocessing
@@ -44,6 +66,156 @@ def _iter_with_loader_config(fn):
     return decorated
 
 
+class _Deferred(object):
+    """Package data that gets evaluated on first access"""
+    __slots__ = ("func",)
+
+    def __init__(self, func):
+        self.func = func
+
+
+class LazyVersions(Mapping):
+    """A version to package data mapping that may defer evaluation
+
+    Memory repository only needs the keys for listing package versions, so
+    deferred package data will not be evaluated until that version is being
+    read.
+
+    """
+
+    def __init__(self, versions=None):
+        self._versions = dict(versions or {})
+        self.on_evaluated = None
+
+    def __getitem__(self, version):
+        data = self._versions[version]
+        if isinstance(data, _Deferred):
+            data = data.func()
+            self._versions[version] = data
+            if self.on_evaluated is not None:
+                self.on_evaluated(data)
+        return data
+
+    def __setitem__(self, version, data):
+        self._versions[version] = data
+
+    def __iter__(self):
+        return iter(self._versions)
+
+    def __len__(self):
+        return len(self._versions)
+
+    def iter_evaluated(self):
+        """Iterate package data that has been evaluated"""
+        for data in self._versions.values():
+            if not isinstance(data, _Deferred):
+                yield data
+
+
+def _estimate_size(data):
+    """Roughly estimate memory size of evaluated package data in bytes"""
+    try:
+        return len(pickle.dumps(data))
+    except Exception:
+        return sys.getsizeof(data)
+
+
+def _uncache(resource):
+    """Drop cached attributes of rez resource, they load again on access"""
+    cls = type(resource)
+    for attr in list(vars(resource)):
+        if isinstance(getattr(cls, attr, None), cached_property):
+            delattr(resource, attr)
+
+
+class LoadedCache(object):
+    """Family name to versions mapping with LRU eviction
+
+    If `max_size` is given, least recently used families will be dropped
+    once the estimated size of evaluated package data exceeds the budget.
+    Dropped families get loaded again on next access.
+
+    Args:
+        max_size (int, optional): Memory budget in bytes, unbounded if None.
+        on_evict (callable, optional): Called with a list of evicted family
+            name and versions pairs.
+
+    """
+
+    def __init__(self, max_size=None, on_evict=None):
+        self._items = OrderedDict()
+        self._sizes = dict()
+        self._total = 0
+        self._max_size = max_size
+        self._on_evict = on_evict
+
+    @property
+    def total_size(self):
+        return self._total
+
+    def __contains__(self, name):
+        return name in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    def __getitem__(self, name):
+        versions = self._items[name]
+        self._items.move_to_end(name)
+        return versions
+
+    def __setitem__(self, name, versions):
+        self._items[name] = versions
+        self._items.move_to_end(name)
+
+        if self._max_size is not None:
+            if isinstance(versions, LazyVersions):
+                evaluated = versions.iter_evaluated()
+                versions.on_evaluated = partial(self._grow, name)
+            else:
+                evaluated = versions.values()
+
+            self._total -= self._sizes.pop(name, 0)
+            self._grow(name, *evaluated)
+
+    def get(self, name, default=None):
+        if name in self._items:
+            return self[name]
+        return default
+
+    def items(self):
+        return list(self._items.items())
+
+    def pop(self, name, default=None):
+        self._total -= self._sizes.pop(name, 0)
+        versions = self._items.pop(name, default)
+        if isinstance(versions, LazyVersions):
+            versions.on_evaluated = None
+        return versions
+
+    def _grow(self, name, *evaluated):
+        """Add size of newly evaluated data of family and evict if over"""
+        if name not in self._items:
+            return
+
+        size = sum(_estimate_size(data) for data in evaluated)
+        self._sizes[name] = self._sizes.get(name, 0) + size
+        self._total += size
+
+        evicted = []
+        while self._total > self._max_size and len(self._items) > 1:
+            oldest = next(iter(self._items))
+            if oldest == name:
+                break
+            evicted.append((oldest, self.pop(oldest)))
+
+        if evicted and self._on_evict is not None:
+            self._on_evict(evicted)
+
+
 class PackageLoader(object):
     """A singleton that loads developer packages from multiple repositories
 
@@ -81,6 +253,7 @@ class PackageLoader(object):
         # init
         #
         self.release = False
+        self.refresh_git_tags = False
         self._dev_repos = None
         self._maker_repo = None
         self.reload_repos()
@@ -118,11 +291,33 @@ class PackageLoader(object):
 
         self._dev_repos = dev_repos
         self._maker_repo = maker_repo
+        self.scan()
+
+    def scan(self):
+        """List and index all developer package repositories concurrently
+
+        Repository roots may sit on different (network) file systems, so
+        they are scanned at the same time instead of one after another.
+        Lookups still go through repositories in configured order.
+
+        """
+        repos = [repo for repo in self._dev_repos
+                 if repo is not self._maker_repo]
+        if len(repos) < 2:
+            for repo in repos:
+                repo.scan()
+            return
+
+        with ThreadPoolExecutor(max_workers=len(repos)) as executor:
+            futures = [executor.submit(repo.scan) for repo in repos]
+        for future in futures:
+            future.result()  # re-raise scanning error, if any
 
     def get_maker_made_package(self, name):
         paths = [self._maker_repo.mem_uid]
         return get_latest_package_from_string(name, paths=paths)
 
+    @profiled("find", package=lambda self, request: request.name)
     @_with_loader_config
     def find(self, request):
         """Find requested latest package
@@ -149,6 +344,7 @@ class PackageLoader(object):
             yield package
 
     def iter_package_family_names(self):
+        self.scan()
         seen = set()
         for repo in self._dev_repos:
             for name in repo.iter_package_family_names():
@@ -156,6 +352,85 @@ class PackageLoader(object):
                     yield name
                 seen.add(name)
 
+    @_with_loader_config
+    def preload(self):
+        """Fetch git tags and evaluate all developer packages ahead
+
+        Git tags of known git-versioned packages are fetched concurrently, and
+        families are evaluated in a process pool if `parallel_load_workers`
+        is set in rez-deliver config, otherwise packages remain being
+        evaluated on demand.
+
+        """
+        for repo in self._dev_repos:
+            repo.preload()
+
+    @_with_loader_config
+    def prefetch_git_tags(self):
+        """Fetch git tags of known git-versioned packages concurrently
+
+        Package definition files are not executed for this, see
+        `DevPkgRepo.prefetch_git_tags`.
+
+        """
+        for repo in self._dev_repos:
+            repo.prefetch_git_tags()
+
+    @_with_loader_config
+    def build_catalog(self):
+        """Write catalog file into each developer package repository root
+
+        Returns:
+            list: written catalog file paths
+
+        """
+        paths = []
+        for repo in self._dev_repos:
+            repo.prefetch_git_tags()
+            path = repo.build_catalog()
+            if path:
+                paths.append(path)
+        return paths
+
+    @_with_loader_config
+    def generated_versions(self, name):
+        """Return versions of family that are not written in package files
+
+        These are versions taken from remote git tags of git-versioned
+        developer packages, and the version made by family's package maker.
+
+        Args:
+            name (str): package family name
+
+        Returns:
+            list: version strings, in repository order
+
+        """
+        versions = []
+        for repo in self._dev_repos:
+            versions += repo.generated_versions(name)
+        return versions
+
+    def cache_stats(self):
+        """Return persistent package data cache hit and miss counts
+
+        Returns:
+            dict: {"hits": int, "misses": int}
+
+        """
+        stats = {"hits": 0, "misses": 0}
+        for repo in self._dev_repos:
+            for key, value in repo.cache_stats().items():
+                stats[key] += value
+        return stats
+
+    def iter_package_files(self):
+        """Iterate package definition files of all developer packages"""
+        self.scan()
+        for repo in self._dev_repos:
+            for filepath in repo.iter_package_files():
+                yield filepath
+
 
 class Repo(object):
     """Base class of developer package repository, internal used."""
@@ -173,9 +448,14 @@ class Repo(object):
         #   evaluated when asked. The evaluation happens in family
         #   level, which means all versions will be loaded once the
         #   family is being asked. Also, evaluated versions will be
-        #   cached.
+        #   cached, within memory budget if set.
         #
-        self._loaded_cache = dict()
+        deliverconfig = rezconfig.plugins.command.deliver
+        budget = deliverconfig.get("loaded_cache_budget_mb")
+        self._loaded_cache = LoadedCache(
+            max_size=None if budget is None else int(budget * 1024 * 1024),
+            on_evict=self._on_cache_evicted,
+        )
         self.mem_repo.data = self
 
     @property
@@ -193,6 +473,57 @@ class Repo(object):
     def iter_dev_packages(self):
         raise NotImplementedError
 
+    def scan(self):
+        pass
+
+    def preload(self):
+        pass
+
+    def prefetch_git_tags(self):
+        pass
+
+    def build_catalog(self):
+        return None
+
+    def iter_watch_targets(self):
+        return iter(())
+
+    def iter_package_files(self):
+        return iter(())
+
+    def generated_versions(self, name):
+        return []
+
+    def evict(self, name):
+        self._loaded_cache.pop(name, None)
+        self.mem_repo.clear_caches()
+
+    def _on_cache_evicted(self, evicted):
+        # Package resources hold their data, release them as well.
+        for name, versions in evicted:
+            self._release_resources(name, versions)
+
+    def _release_resources(self, name, versions):
+        """Drop package data that memory repository resources still hold
+
+        Resources are cached in rez's resource pool, which is shared by all
+        repositories and can only be cleared as a whole. Instead, cached
+        attributes of this family's package and variant resources are
+        dropped, so only this family gets loaded again on next access.
+
+        """
+        mem_repo = self.mem_repo
+        for version in versions:
+            package = mem_repo.get_resource("memory.package",
+                                            name=name,
+                                            version=str(version))
+            if "_data" not in vars(package):
+                continue  # never been read
+
+            for variant in package.iter_variants():
+                _uncache(variant)
+            _uncache(package)
+
     def get_dev_package_versions(self, name):
         raise NotImplementedError
 
@@ -226,32 +557,38 @@ class Repo(object):
     def has_package(self, name):
         raise NotImplementedError
 
+    def cache_stats(self):
+        return {"hits": 0, "misses": 0}
+
 
 class MakePkgRepo(Repo):
     """A set of pre-defined package-maker generated packages, like rez-bind"""
 
     def __init__(self, loader):
         Repo.__init__(self, root="rez:package_maker", loader=loader)
+        self._makers = None
+        self._maker_funcs = dict()
 
     @property
     def makers(self):
-        return {
-            "os": pkg_os,
-            "arch": pkg_arch,
-            "platform": pkg_platform,
-            "rez": pkg_rez,
-        }
+        """Family name to maker source mapping, makers are not imported"""
+        if self._makers is None:
+            self._makers = maker_sources()
+        return self._makers
 
     def has_package(self, name):
         return name in self.makers
 
     def iter_dev_packages(self):
-        for name in self.makers:
+        for name in list(self.makers):
             if name in self._loaded_cache:
                 versions = self._loaded_cache[name]
 
             else:
                 package = self._make_package(name)
+                if package is None:
+                    continue
+
                 data = package.data
                 version = data.get("version", "_NO_VERSION")
                 versions = {version: data}
@@ -282,10 +619,29 @@ class MakePkgRepo(Repo):
         for name in self.makers:
             yield name
 
+    def generated_versions(self, name):
+        if name not in self.makers:
+            return []
+        return [str(v) for v, _ in self.get_dev_package_versions(name)]
+
     def _make_package(self, name):
         release = self._loader.release
-        func = self.makers.get(name)
-        if func is not None:
+        source = self.makers.get(name)
+        if source is not None:
+            func = self._maker_funcs.get(name)
+            if func is None:
+                try:
+                    func = load_maker(source)
+                except (ImportError, AttributeError, ValueError) as e:
+                    # Don't let a bad entry break resolving other packages,
+                    #   it's now unavailable as if not registered.
+                    print("Package maker %r (%s) is unavailable: %s"
+                          % (name, source, e))
+                    self.makers.pop(name)
+                    return None
+
+                self._maker_funcs[name] = func
+
             maker = func(release=release)
             maker.__source__ = self.mem_uid
             return maker.get_package()
@@ -325,56 +681,254 @@ class DevPkgRepo(Repo):
     """
     def __init__(self, root, loader):
         Repo.__init__(self, root=root, loader=loader)
-        self._seen_cache = dict()
+        # family name -> `PackageFamily`, rebuilt when root dir is modified
+        self._families = None
+        self._families_mtime = None
+        # pre-built catalog, looked up before evaluating any package
+        self._catalog = Catalog(root)
+        # persistent cache of evaluated package data, this is where the
+        #   `_loaded_cache` falls back to before evaluating package.py
+        self._data_cache = PackageDataCache(cache_dir("packages"))
+        # git tags fetched from remote, shared with other processes via
+        #   persistent cache until expired.
+        deliverconfig = rezconfig.plugins.command.deliver
+        self._tags_cache = DiskCache(cache_dir("git_tags"),
+                                     ttl=deliverconfig.get("git_tags_ttl"))
+        self._tags_memo = dict()
+        self._tags_refresh = False
+        # git url of each package file, so prefetching git tags doesn't
+        #   need to execute package definition files.
+        self._urls_cache = DiskCache(cache_dir("git_urls"))
+
+    @property
+    def refresh_git_tags(self):
+        return self._tags_refresh or \
+            getattr(self._loader, "refresh_git_tags", False)
+
+    def cache_stats(self):
+        return self._data_cache.stats()
 
     def has_package(self, name):
-        existence = self._seen_cache.get(name)
-        if existence is None:
-            for family in self.iter_package_family_names():
-                if name == family:
-                    existence = True
-                    break
-            self._seen_cache[name] = existence or False
+        return name in self._family_index()
 
-        return existence
+    def scan(self):
+        self._family_index()
 
-    def iter_dev_packages(self):
-        for family in iter_package_families(paths=[self._root]):
-            name = family.name  # package dir name
+    def _family_index(self):
+        """Return family name to `PackageFamily` mapping of this repository
 
-            if name in self._loaded_cache:
-                versions = self._loaded_cache[name]
+        The index is built once and only rebuilt if the modification time of
+        repository root has changed, e.g. family added or removed.
 
-            else:
-                versions = dict()
-                for version, data in self._generate_dev_packages(family):
-                    versions[version] = data
-                self._loaded_cache[name] = versions
+        """
+        try:
+            mtime = os.stat(self._root).st_mtime_ns
+        except OSError:
+            mtime = None
+
+        if self._families is None or mtime != self._families_mtime:
+            if self._families is not None:
+                # filesystem repository caches family listing in session
+                fs_repo = package_repository_manager.get_repository(
+                    self._root)
+                fs_repo.get_families.cache_clear()
+                fs_repo.get_family.cache_clear()
+
+            self._families = {
+                family.name: family  # package dir name
+                for family in iter_package_families(paths=[self._root])
+            }
+            self._families_mtime = mtime
 
-            yield name, versions
+        return self._families
 
-    def get_dev_package_versions(self, name):
-        if name in self._loaded_cache:
-            versions = self._loaded_cache[name]
-            for version, data in versions.items():
-                yield version, data
+    def preload(self):
+        """Prefetch git tags and evaluate not yet loaded families in a pool
 
-        else:
-            it = iter_package_families(paths=[self._root])
-            family = next((f for f in it if f.name == name), None)
+        Git tags are always prefetched concurrently, see `prefetch_git_tags`.
+
+        Evaluating developer package changes process-global states (cwd and
+        environment), so threads cannot help. Instead, families are sent to
+        a pool of `parallel_load_workers` processes and the resulting data
+        dicts are merged back into `_loaded_cache`.
+
+        Families that failed in worker process are evaluated on demand,
+        see `ProcessPool`.
+
+        """
+        self.prefetch_git_tags()
+
+        deliverconfig = rezconfig.plugins.command.deliver
+        workers = deliverconfig.get("parallel_load_workers") or 0
+        if workers < 2:
+            return
+
+        names = [
+            name for name, family in list(self._family_index().items())
+            if name not in self._loaded_cache
+            and not self._load_from_catalog(family)
+        ]
+        if len(names) < 2:
+            return
+
+        settings = self._loader.settings if self._loader else dict()
+        refresh = self.refresh_git_tags
+        jobs = {
+            name: (self._root, name, settings, refresh, self._tags_memo)
+            for name in names
+        }
+        with ProcessPool(workers) as pool:
+            for name, (versions, stats) in pool.run(_evaluate_family, jobs):
+                self._loaded_cache[name] = LazyVersions(versions)
+                self._data_cache.hits += stats["hits"]
+                self._data_cache.misses += stats["misses"]
+
+    def iter_package_files(self):
+        for name, family in sorted(self._family_index().items()):
+            for package in family.iter_packages():
+                if package.uri:
+                    yield package.uri
+
+    def generated_versions(self, name):
+        family = self._family_index().get(name)
+        if family is None:
+            return []
+
+        versions = []
+        for package in family.iter_packages():
+            if not package.uri:
+                continue
+            git_url = self._git_url(package)
+            if git_url:
+                versions += self._sorted_versions_from_remote(git_url)
+        return sorted(versions)  # package order is random
+
+    def iter_watch_targets(self):
+        """Iterate files and directories that loaded families depend on
+
+        Yields:
+            tuple: family name, family directory, and a list of package
+                definition files and `@include` module files
+
+        """
+        for name, versions in list(self._loaded_cache.items()):
+            family = self._family_index().get(name)
             if family is None:
-                return
+                continue
 
-            versions = dict()
-            for version, data in self._generate_dev_packages(family):
-                versions[version] = data
-                yield version, data
+            files = set(p.uri for p in family.iter_packages() if p.uri)
+            for data in versions.iter_evaluated():
+                files.update(include_paths(include_names(data)))
 
-            self._loaded_cache[name] = versions
+            yield name, os.path.join(self._root, name), sorted(files)
+
+    def evict(self, name):
+        """Drop loaded family so it will be loaded again on next access"""
+        Repo.evict(self, name)
+        # filesystem repository caches family and package listing
+        fs_repo = package_repository_manager.get_repository(self._root)
+        fs_repo.clear_caches()
+        self._families = None
+
+    def build_catalog(self):
+        """Evaluate all packages and write catalog file into repository root
+
+        Returns:
+            str: catalog file path
+
+        """
+        if self._data_cache.enabled:
+            # definitions loaded by pool workers are picked up from cache
+            self.preload()
+
+        families = dict()
+        for name, family in list(self._family_index().items()):
+            families[name] = list(self._iter_definitions(family))
+
+        self._catalog.write(families)
+        return self._catalog.filepath
+
+    def _iter_definitions(self, family):
+        """Iterate loaded definitions of every version in family
+
+        Yields:
+            tuple: package file path, version tag and definition data
+
+        """
+        for package in family.iter_packages():
+            if not package.uri:
+                continue
+
+            filepath = package.uri
+            with os_chdir(os.path.dirname(filepath)):
+                git_url = self._git_url(package)
+                if git_url:
+                    ver_tags = self._sorted_versions_from_remote(git_url)
+                else:
+                    ver_tags = [None]
+
+                for ver_tag in ver_tags:
+                    definition = self._load_definition(filepath,
+                                                       ver_tag=ver_tag)
+                    yield filepath, ver_tag, definition
+
+    def iter_dev_packages(self):
+        self.preload()
+
+        for name in self.iter_package_family_names():
+            yield name, self._load_family(name)
+
+    def get_dev_package_versions(self, name):
+        for version, data in self._load_family(name).items():
+            yield version, data
+
+    def __getitem__(self, name):
+        # Return versions mapping as-is, so deferred package data will only
+        #   be evaluated when memory repository reads that version.
+        with override_config({"allow_unversioned_packages": True}):
+            return self._load_family(name)
+
+    def _load_family(self, name):
+        if name in self._loaded_cache:
+            hit("find")
+            return self._loaded_cache[name]
+        hit("find", False)
+
+        family = self._family_index().get(name)
+        if family is None:
+            return LazyVersions()
+
+        if self._load_from_catalog(family):
+            return self._loaded_cache[name]
+
+        versions = LazyVersions()
+        for version, data in self._generate_dev_packages(family):
+            versions[version] = data
+
+        self._loaded_cache[name] = versions
+        return versions
+
+    def _load_from_catalog(self, family):
+        definitions = self._catalog.get_definitions(
+            family, sorted_ver_tags=self._sorted_versions_from_remote)
+        if definitions is None:
+            return False
+
+        versions = LazyVersions()
+        for filepath, ver_tag, definition in definitions:
+            version = _definition_version(definition)
+            versions[version] = _Deferred(partial(self._evaluate_deferred,
+                                                  filepath,
+                                                  ver_tag,
+                                                  version,
+                                                  definition))
+
+        self._loaded_cache[family.name] = versions
+        return True
 
     def iter_package_family_names(self):
-        for family in iter_package_families(paths=[self._root]):
-            yield family.name  # package dir name
+        for name in list(self._family_index()):
+            yield name
 
     def _generate_dev_packages(self, family):
         for package in family.iter_packages():  # package order is random
@@ -391,36 +945,173 @@ class DevPkgRepo(Repo):
                 # with message "reading log message from standard input", if
                 # cwd is not (in) a git repository.
 
-                git_url = package.data.get("git_url")
+                git_url = self._git_url(package)
 
                 if git_url:
-                    # generate versions from git tags
-                    for ver_str in self._sorted_versions_from_remote(git_url):
-                        with temp_env("REZ_DELIVER_PKG_PAYLOAD_VER", ver_str):
-                            developer = DeveloperPackage.from_path(dirpath)
+                    # generate versions from git tags, package data will be
+                    #   evaluated on demand if the version can be probed.
+                    prober = self._version_prober(filepath)
 
-                            data = developer.data.copy()
-                            data["__ver_tag__"] = ver_str
-                            data["__source__"] = developer.filepath
+                    for ver_str in self._sorted_versions_from_remote(git_url):
+                        version = prober(ver_str)
+
+                        if version is not None:
+                            data = _Deferred(partial(self._evaluate_deferred,
+                                                     filepath,
+                                                     ver_str,
+                                                     version))
+                        else:
+                            data = self._evaluate(filepath, ver_tag=ver_str)
                             version = data.get("version", "_NO_VERSION")
 
-                            yield version, data
+                        yield version, data
 
                 else:
-                    developer = DeveloperPackage.from_path(dirpath)
-
-                    data = developer.data.copy()
-                    data["__source__"] = developer.filepath
+                    data = self._evaluate(filepath)
                     version = data.get("version", "_NO_VERSION")
 
                     yield version, data
 
+    def _version_prober(self, filepath):
+        """Return a function that computes version from git tag cheaply
+
+        See `deliver._rezcompat.version_prober`.
+
+        """
+        return _rezcompat.version_prober(filepath)
+
+    def _evaluate_deferred(self, filepath, ver_tag, version, definition=None):
+        """Evaluate package data that was listed without being evaluated
+
+        That is, versions probed by `_version_prober` and definitions read
+        from catalog. The data may be read long after the family was listed,
+        and outside of loader config, so the config is applied again here.
+        Otherwise the requires like "foo-*" cannot be expanded with developer
+        packages.
+
+        Raises:
+            RezDeliverFatalError: if the evaluated version is not the one
+                that the memory repository has already listed.
+
+        """
+        if self._loader is not None:
+            settings = self._loader.settings
+        else:
+            # pool worker, loader config is applied by `_evaluate_family`
+            settings = {"allow_unversioned_packages": True}
+
+        with override_config(settings), os_chdir(os.path.dirname(filepath)):
+            data = self._evaluate(filepath,
+                                  ver_tag=ver_tag,
+                                  definition=definition)
+
+        evaluated = _definition_version(data)
+        if evaluated != version:
+            raise RezDeliverFatalError(
+                "Package %s evaluated version %r from git tag %r, but %r "
+                "was listed." % (filepath, evaluated, ver_tag, version))
+
+        return data
+
+    def _evaluate(self, filepath, ver_tag=None, definition=None):
+        """Evaluate developer package, with definition from persistent cache
+
+        Must be called within package directory.
+
+        Args:
+            filepath (str): package definition file path
+            ver_tag (str, optional): Payload version from git tag
+            definition (dict, optional): Loaded definition data, e.g. from
+                catalog. Loaded from file or cache if not given.
+
+        Returns:
+            dict: evaluated package data
+
+        """
+        if definition is None:
+            definition = self._load_definition(filepath, ver_tag=ver_tag)
+
+        if ver_tag:
+            with temp_env("REZ_DELIVER_PKG_PAYLOAD_VER", ver_tag):
+                developer = _rezcompat.developer_package(filepath, definition)
+        else:
+            developer = _rezcompat.developer_package(filepath, definition)
+
+        data = developer.data.copy()
+        if ver_tag:
+            data["__ver_tag__"] = ver_tag
+        data["__source__"] = developer.filepath
+        return data
+
+    def _load_definition(self, filepath, ver_tag=None):
+        """Load package definition file, or get it from persistent cache
+
+        This is the costly part of evaluation, where the definition file is
+        executed and early bound attributes are computed. Requirements are
+        not yet expanded, so the loaded data does not depend on what other
+        packages are available at the time.
+
+        Must be called within package directory.
+
+        Args:
+            filepath (str): package definition file path
+            ver_tag (str, optional): Payload version from git tag
+
+        Returns:
+            dict: loaded package definition data
+
+        """
+        definition = self._data_cache.get_data(filepath, ver_tag=ver_tag)
+        if definition is not None:
+            return definition
+
+        if ver_tag:
+            with temp_env("REZ_DELIVER_PKG_PAYLOAD_VER", ver_tag):
+                definition = _rezcompat.load_package_file(filepath)
+        else:
+            definition = _rezcompat.load_package_file(filepath)
+
+        self._data_cache.set_data(filepath,
+                                  definition,
+                                  includes=include_names(definition),
+                                  ver_tag=ver_tag)
+        return definition
+
+    def _git_url(self, package):
+        """Return git url of developer package, or None if not git-versioned
+
+        The url is taken from catalog or cache if the package file hasn't
+        changed, otherwise package data is loaded (in package dir, same as
+        in `_generate_dev_packages`) and the url is cached.
+
+        """
+        filepath = package.uri
+        git_url = self._known_git_url(filepath)
+        if git_url is None:
+            with os_chdir(os.path.dirname(filepath)):
+                git_url = package.data.get("git_url") or ""
+            self._urls_cache.set((filepath, file_hash(filepath)), git_url)
+        return git_url or None
+
+    def _known_git_url(self, filepath):
+        """Return git url of package file without loading it
+
+        Returns:
+            str: git url, empty string if the package is not git-versioned,
+                or None if unknown, i.e. never loaded since file changed.
+
+        """
+        git_url = self._catalog.get_git_url(filepath)
+        if git_url is None:
+            git_url = self._urls_cache.get((filepath, file_hash(filepath)))
+        return git_url
+
     def _sorted_versions_from_remote(self, git_url):
         deliverconfig = rezconfig.plugins.command.deliver
         limit = deliverconfig.max_git_tag_from_remote
         versions = list()
 
-        for ver_tag in self._git_tags(git_url):
+        for ver_tag in self._cached_git_tags(git_url):
             try:
                 version = Version(ver_tag)
             except VersionError as e:
@@ -432,12 +1123,206 @@ class DevPkgRepo(Repo):
             str(version) for version in sorted(versions)[-limit:]
         ]
 
-    def _git_tags(self, url):
+    def prefetch_git_tags(self):
+        """Fetch git tags of all not yet loaded git-versioned packages
+
+        Remotes that are not in cache are queried concurrently with at most
+        `git_fetch_workers` threads, and each `git ls-remote` call will be
+        killed after `git_fetch_timeout` seconds. Results are stored for
+        `_sorted_versions_from_remote` to use.
+
+        Package definition files are not executed here, only packages that
+        have known git url (see `_known_git_url`) are prefetched. Others get
+        their tags fetched when loaded.
+
+        """
+        deliverconfig = rezconfig.plugins.command.deliver
+        workers = deliverconfig.get("git_fetch_workers") or 1
+        timeout = deliverconfig.get("git_fetch_timeout")
+
+        urls = set()
+        for family in list(self._family_index().values()):
+            if family.name in self._loaded_cache:
+                continue
+            for package in family.iter_packages():
+                if not package.uri:
+                    continue
+                try:
+                    git_url = self._known_git_url(package.uri)
+                except OSError:
+                    continue  # removed since listed
+                if git_url and git_url not in self._tags_memo:
+                    urls.add(git_url)
+
+        if not self.refresh_git_tags:
+            for url in list(urls):
+                tags = self._tags_cache.get(url)
+                if tags is not None:
+                    self._tags_memo[url] = tags
+                    urls.remove(url)
+
+        if not urls:
+            return
+
+        def fetch(url_):
+            return list(self._git_tags(url_, timeout=timeout))
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {url: executor.submit(fetch, url) for url in urls}
+            for url, future in futures.items():
+                self._store_git_tags(url, future.result())
+
+    @profiled("git", package=lambda self, url: url)
+    def _cached_git_tags(self, url):
+        """Return git tags of remote from cache, fetch if missing/expired
+
+        If loader's `refresh_git_tags` is True, tags will be fetched from
+        remote once in this session regardless the cache.
+
+        """
+        if url in self._tags_memo:
+            hit("git")
+            return self._tags_memo[url]
+
+        tags = None if self.refresh_git_tags else self._tags_cache.get(url)
+        hit("git", tags is not None)
+
+        if tags is None:
+            deliverconfig = rezconfig.plugins.command.deliver
+            timeout = deliverconfig.get("git_fetch_timeout")
+            tags = list(self._git_tags(url, timeout=timeout))
+            self._store_git_tags(url, tags)
+        else:
+            self._tags_memo[url] = tags
+
+        return tags
+
+    def _store_git_tags(self, url, tags):
+        if tags:  # don't cache failure
+            self._tags_cache.set(url, tags)
+        self._tags_memo[url] = tags
+
+    def _git_tags(self, url, timeout=None):
         args = ["git", "ls-remote", "--tags", url]
         try:
-            output = subprocess.check_output(args, universal_newlines=True)
-        except subprocess.CalledProcessError as e:
+            output = subprocess.check_output(args,
+                                             universal_newlines=True,
+                                             timeout=timeout)
+        except (subprocess.CalledProcessError,
+                subprocess.TimeoutExpired) as e:
             print(e)
         else:
             for line in output.splitlines():
+                if line.endswith("^{}"):
+                    continue  # peeled annotated tag
                 yield line.split("refs/tags/")[-1]
+
+
+class InstalledPackageIndex(object):
+    """In-memory index of installed packages for repeated lookups
+
+    Packages of each family are listed once per package path set, and only
+    listed again if any repository root, family or version directory has
+    been modified. Modification times are checked once per family after each
+    `refresh()`, lookups in between are answered from memory.
+
+    """
+
+    def __init__(self):
+        # (paths, family name) -> (modification stamps, packages)
+        self._families = dict()
+        self._checked = set()
+
+    def refresh(self):
+        """Validate indexed families against modification times on next use"""
+        self._checked.clear()
+
+    def find_latest(self, name, range_=None, paths=None):
+        """Return latest installed package in range, or None if not found
+
+        Args:
+            name (str): package family name
+            range_ (`VersionRange`, optional): version range
+            paths (list, optional): package paths, default from rez config
+
+        Returns:
+            `Package` or None
+
+        """
+        paths = tuple(paths or rezconfig.packages_path)
+        packages = self._packages(name, paths)
+        candidates = [
+            package for package in packages
+            if range_ is None or package.version in range_
+        ]
+        if candidates:
+            return max(candidates, key=lambda p: p.version)
+
+    def _packages(self, name, paths):
+        key = (paths, name)
+        entry = self._families.get(key)
+        if entry is not None and key in self._checked:
+            hit("find_installed")
+            return entry[1]
+
+        stamps = path_stamps(paths, name)
+        hit("find_installed", entry is not None and entry[0] == stamps)
+        if entry is None or entry[0] != stamps:
+            if entry is not None:
+                # filesystem repository caches package listing in session
+                for path in paths:
+                    package_repository_manager.get_repository(
+                        path).clear_caches()
+
+            packages = list(iter_packages(name, paths=list(paths)))
+            entry = self._families[key] = (stamps, packages)
+
+        self._checked.add(key)
+        return entry[1]
+
+
+def _definition_version(definition):
+    """Return version string of package definition or evaluated data"""
+    version = definition.get("version")
+    if version is None:
+        return "_NO_VERSION"
+    try:
+        return str(Version(str(version)))
+    except VersionError:
+        return str(version)
+
+
+def _evaluate_family(root,
+                     name,
+                     settings,
+                     refresh_git_tags=False,
+                     git_tags=None):
+    """Evaluate all versions of a developer package family
+
+    This is the process pool worker of `DevPkgRepo.preload`.
+
+    Args:
+        root (str): developer package repository root
+        name (str): package family name
+        settings (dict): loader config overrides
+        refresh_git_tags (bool): fetch git tags regardless the cache
+        git_tags (dict, optional): prefetched git tags of each remote url
+
+    Returns:
+        tuple: (versions dict, persistent cache stats dict)
+
+    """
+    repo = DevPkgRepo(root=root, loader=None)
+    repo._tags_refresh = refresh_git_tags
+    repo._tags_memo.update(git_tags or {})
+    family = get_package_family_from_repository(name, root)
+    versions = dict()
+
+    if family is not None:
+        with override_config(settings):
+            for version, data in repo._generate_dev_packages(family):
+                if isinstance(data, _Deferred):
+                    data = data.func()
+                versions[version] = data
+
+    return versions, repo.cache_stats()
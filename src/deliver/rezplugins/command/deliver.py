@@ -41,9 +41,31 @@ def setup_parser(parser, completions=False):
     parser.add_argument("--dry-run", action="store_true",
                         help="List out all packages that will be deployed "
                              "and exit.")
+    parser.add_argument("--expand-installed", action="store_true",
+                        help="Also resolve dependencies of packages that "
+                             "are already installed, which are skipped by "
+                             "default since nothing in there gets deployed.")
+    parser.add_argument("--combined-solve", action="store_true",
+                        help="Solve all requested packages together once, "
+                             "and take build-time contexts from there "
+                             "whenever it picks the latest versions. "
+                             "Faster for large bundles.")
+    parser.add_argument("--profile", action="store_true",
+                        help="Print time spent in each phase of deploy "
+                             "planning.")
+    parser.add_argument("--profile-json", metavar="PATH",
+                        help="Profile deploy planning like --profile, and "
+                             "write JSON report to given file path.")
     parser.add_argument("-l", "--list", action="store_true",
                         help="List out packages that can be deployed. If "
                              "`packages` given, versions will be listed.")
+    parser.add_argument("--refresh-git-tags", action="store_true",
+                        help="Fetch git tags from remote regardless the "
+                             "cached ones.")
+    parser.add_argument("--build-catalog", action="store_true",
+                        help="Evaluate all developer packages and write a "
+                             "catalog file into each developer repository "
+                             "root for fast loading.")
     parser.add_argument("-y", "--yes", action="store_true",
                         help="Yes to all.")
     parser.add_argument("-G", "--gui", action="store_true",
@@ -54,16 +76,23 @@ def setup_parser(parser, completions=False):
 
 def command(opts, parser=None, extra_arg_groups=None):
     from rez.config import config
-    from deliver import cli
+    from deliver import cli, api
 
     if opts.version:
         from deliver._version import print_info
         sys.exit(print_info())
 
+    if opts.refresh_git_tags:
+        api.PackageLoader().refresh_git_tags = True
+
     if opts.gui:
         from deliver.gui import app
         return app.main()
 
+    if opts.build_catalog:
+        cli.build_catalog()
+        return
+
     if opts.list:
         cli.list_developer_packages(opts.PKG)
         return
@@ -74,7 +103,11 @@ def command(opts, parser=None, extra_arg_groups=None):
         path = config.local_packages_path
 
     if opts.PKG:
-        if cli.deploy_packages(opts.PKG, path, opts.dry_run, opts.yes):
+        if cli.deploy_packages(opts.PKG, path, opts.dry_run, opts.yes,
+                               expand_installed=opts.expand_installed,
+                               combined_solve=opts.combined_solve,
+                               profile=opts.profile,
+                               profile_json=opts.profile_json):
             if not opts.dry_run:
                 print("=" * 30)
                 print("SUCCESS!\n")
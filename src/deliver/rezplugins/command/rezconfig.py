@@ -14,4 +14,58 @@ deliver = {
 
     "max_git_tag_from_remote": 10,
 
+    # Seconds that git tags fetched from remote stay in persistent cache
+    # (requires `cache_root`). Tags are cached until next explicit refresh
+    # if set to None.
+    "git_tags_ttl": 3600,
+
+    # Max number of `git ls-remote` running concurrently when prefetching
+    # git tags, and seconds to wait for each remote before giving up.
+    "git_fetch_workers": 8,
+    "git_fetch_timeout": 30,
+
+    # Directory for persistent caches, e.g. evaluated developer packages
+    # and git tags, shared by all rez-deliver processes of the user,
+    # including package build subprocesses. Persistent caching is disabled
+    # if set to None.
+    "cache_root": "~/.cache/rez-deliver",
+
+    # PyPI-like simple index URL, or a local directory of rez release
+    # archives, for looking up latest rez version that the package maker
+    # installs. Default is PyPI if not set.
+    "rez_index_url": None,
+
+    # Seconds that looked up rez version stays in persistent cache (requires
+    # `cache_root`), and seconds to wait for the index before giving up.
+    "rez_version_ttl": 86400,
+    "rez_index_timeout": 5,
+
+    # Directory of rez wheels that shared by all variants of rez maker
+    # package and later deployments, so rez is only downloaded once. Wheels
+    # are unpacked into its `unpacked` sub-directory, and variants hardlink
+    # files from there. Could be pre-populated for offline use. Defaults to
+    # `wheels` sub-directory of `cache_root`, and wheelhouse is not used if
+    # both unset.
+    "wheelhouse": None,
+
+    # Additional package makers (like rez-bind), family name to maker
+    # function source in "module:function" form. Set to None for disabling
+    # a built-in maker. See `deliver.maker`.
+    "package_makers": {},
+
+    # Memory budget (in MB) of evaluated developer packages that kept in
+    # each repository, least recently used families will be dropped and
+    # re-loaded on demand if exceeded. Unbounded if None.
+    "loaded_cache_budget_mb": None,
+
+    # Number of processes for evaluating developer packages in parallel on
+    # full load (e.g. GUI or listing). Packages are evaluated one family at
+    # a time in current process if less than 2.
+    "parallel_load_workers": 0,
+
+    # Number of processes for solving build-time contexts of package
+    # variants in parallel on resolving deploy manifest. Contexts are
+    # solved one at a time in current process if less than 2.
+    "parallel_solve_workers": 0,
+
 }
@@ -9,19 +9,28 @@ Example:
 """
 import os
 import re
+import hashlib
+from io import StringIO
 from functools import partial
+from collections import OrderedDict, namedtuple
 from contextlib import contextmanager
 
 from rez.config import config as rezconfig
+from rez.system import system
 from rez.utils.formatting import PackageRequest, is_valid_package_name
+from rez.vendor.version.requirement import VersionedObject
 from rez.resolved_context import ResolvedContext
 from rez.developer_package import DeveloperPackage
-from rez.packages import Package, get_latest_package
+from rez.packages import Package
 from rez.exceptions import PackageFamilyNotFoundError, PackageNotFoundError
 
-from deliver.repository import PackageLoader
+from deliver.repository import PackageLoader, InstalledPackageIndex
 from deliver.exceptions import RezDeliverRequestError, RezDeliverFatalError
-from deliver.lib import os_chdir, override_config, expand_path, temp_env
+from deliver.lib import os_chdir, override_config, expand_path, temp_env, \
+    path_stamps, ProcessPool
+from deliver.cache import DiskCache, cache_dir, file_hash
+from deliver._version import __version__
+from deliver.profiler import profiled, hit
 
 
 class Required(object):
@@ -37,14 +46,16 @@ class Required(object):
 
     @classmethod
     def get(cls, name, index=-1, from_=None):
+        """Get existing `Required` from (name, index) mapping, or a new one"""
         name = str(name)
-        from_ = from_ or []
-        try:
-            req_id = from_.index((name, index))
-        except ValueError:
+        requested = (from_ or {}).get((name, index))
+        if requested is None:
             return cls(name, index)
-        else:
-            return from_[req_id]
+        return requested
+
+    @property
+    def id(self):
+        return self.name, self.index
 
     def __eq__(self, other):
         return other == (self.name, self.index)
@@ -94,11 +105,36 @@ class RequestSolver(object):
 
     def __init__(self, loader=None):
         self.loader = loader or PackageLoader()
+        # Do not resolve dependencies of installed or external variants,
+        #   since nothing in those subtrees will be built.
+        self.stop_at_installed = False
+        # Solve all requests at once in `resolve()`, and take build-time
+        #   contexts from that solve whenever possible.
+        self.combined_solve = False
+        self._union = None
         self._release = False
+        # installed packages, validated once per resolve
+        self._installed = InstalledPackageIndex()
+        # finished manifests of `resolve()`, keyed by input fingerprint
+        self._plans = DiskCache(cache_dir("resolves"))
         self._deploy_path = None
-        self._requirements = list()
+        # (name, index) -> `Required`, in resolved order
+        self._requirements = OrderedDict()
+        # (request, index) -> (name, index) of requested variants, and
+        #   (name, index) -> set of (name, index) that it depends on.
+        self._roots = OrderedDict()
+        self._edges = dict()
         self._conflicts = list()
-        self.__depended = None
+        # build-time contexts of same requests, reset per resolve
+        self._contexts = dict()
+        self._contexts_hits = 0
+        self._contexts_misses = 0
+        # contexts solved in process pool, not yet asked
+        self._presolved = dict()
+        # process pool of solving contexts, shared within one resolve
+        self._pool = None
+        # re-evaluated developer packages, reset per resolve
+        self._re_evaluated = dict()
 
     @property
     def is_release(self):
@@ -115,8 +151,15 @@ class RequestSolver(object):
 
     def reset(self):
         """Reset resolved manifest"""
-        self._requirements = []
-        self.__depended = None
+        self._requirements = OrderedDict()
+        self._roots = OrderedDict()
+        self._edges = dict()
+        self._contexts = dict()
+        self._contexts_hits = 0
+        self._contexts_misses = 0
+        self._presolved = dict()
+        self._re_evaluated = dict()
+        self._installed.refresh()
 
     def deploy_to(self, path):
         """Set package deploy path
@@ -175,8 +218,180 @@ class RequestSolver(object):
                 requests_.append((_request, index))
         # resolve
         with self.conflicts(*conflicts):
-            for _request, index in requests_:
-                self._resolve_one(_request, variant_index=index)
+            fingerprint = self._fingerprint(requests)
+            if self._restore_plan(fingerprint):
+                return
+
+            # fetch tags of known git-versioned packages at once, instead of
+            #   one by one while resolving.
+            self.loader.prefetch_git_tags()
+
+            if self.combined_solve:
+                self._union = self._solve_union([r for r, _ in requests_])
+            try:
+                with self._shared_pool():
+                    for _request, index in requests_:
+                        self._resolve_one(_request, variant_index=index)
+            finally:
+                self._union = None
+
+            self._store_plan(fingerprint)
+
+    def _solve_union(self, requests):
+        """Solve all requests in one build-time context
+
+        Returns:
+            dict: family name to resolved `Variant`, or None if the requests
+                cannot be satisfied together.
+
+        """
+        try:
+            context = self._build_context(requests)
+        except (PackageFamilyNotFoundError, PackageNotFoundError):
+            context = None
+
+        if context is None or not context.success:
+            print("Requests cannot be solved together, solving separately.")
+            return None
+
+        return OrderedDict(
+            (variant.name, variant) for variant in context.resolved_packages
+        )
+
+    def _union_context(self, variant_requires):
+        """Return build-time context taken from combined solve, or None
+
+        The context consists of the variants in combined solve that are
+        required by `variant_requires`, transitively. None is returned if
+        any of the requirement is not satisfied by the combined solve, or
+        the combined solve did not pick the latest version in range, e.g.
+        "py" is pinned to an older version by another request, in which
+        case a separate solve may pick differently.
+
+        """
+        if self._union is None:
+            return None
+
+        required = set()
+        stack = list(variant_requires)
+        while stack:
+            request = stack.pop()
+            if request.conflict:
+                continue
+            variant = self._union.get(request.name)
+            if variant is None or variant.version not in request.range:
+                return None
+            if variant.version != self._latest_version(request):
+                return None
+            if variant.name in required:
+                continue
+            required.add(variant.name)
+            stack.extend(variant.get_requires(build_requires=True))
+
+        resolved = [
+            ResolvedVariant(v.qualified_package_name, v.index)
+            for name, v in self._union.items() if name in required
+        ]
+        return SolvedContext(True, resolved)
+
+    def _latest_version(self, request):
+        """Return latest developer or installed version in request range"""
+        packages = [self.loader.find(request), self._find_installed(request)]
+        versions = [p.version for p in packages if p is not None]
+        return max(versions) if versions else None
+
+    def _fingerprint(self, requests):
+        """Return a digest of all inputs of `resolve()`, or None
+
+        Inputs are the requests, conflicts, deploy path and mode, content of
+        developer package definitions and `@include` modules. Installed and
+        generated versions are checked per family on restore instead, see
+        `_plan_state`. Not available (None) if the persistent cache is
+        disabled, or git tags are asked to be refreshed.
+
+        """
+        if not self._plans.enabled or self.loader.refresh_git_tags:
+            return None
+
+        digest = hashlib.sha1()
+
+        def update(*values):
+            digest.update(repr(values).encode("utf-8"))
+
+        update(__version__,
+               list(requests),
+               [str(r) for r in self._conflicts],
+               self.deploy_path,
+               self._release,
+               self.stop_at_installed,
+               self.combined_solve,
+               self.loader.paths,
+               system.variant)
+
+        for filepath in self.loader.iter_package_files():
+            update(filepath, file_hash(filepath))
+
+        include_path = rezconfig.package_definition_python_path
+        if include_path and os.path.isdir(include_path):
+            for name in sorted(os.listdir(include_path)):
+                filepath = os.path.join(include_path, name)
+                update(name, file_hash(filepath))
+
+        return digest.hexdigest()
+
+    def _plan_state(self, names):
+        """Return the state of package families that a plan depends on
+
+        The state of each family is the modification times of installed
+        repository and family directories, and versions that are not in
+        package definition files, i.e. from remote git tags or made by
+        package maker. Only families in the plan are checked, so restoring
+        a plan does not scan whole repositories.
+
+        Args:
+            names (iterable): package family names
+
+        Returns:
+            dict: family name to state
+
+        """
+        paths = self.installed_packages_path
+        return {
+            name: (path_stamps(paths, name),
+                   self.loader.generated_versions(name))
+            for name in sorted(set(names))
+        }
+
+    def _plan_families(self):
+        return [PackageRequest(requested.name).name
+                for requested in self._requirements.values()]
+
+    def _restore_plan(self, fingerprint):
+        if fingerprint is None:
+            return False
+
+        plan = self._plans.get(fingerprint)
+        if plan is None:
+            return False
+
+        requirements, roots, edges, state = plan
+        if state != self._plan_state(state):
+            return False
+
+        self._requirements, self._roots, self._edges = \
+            requirements, roots, edges
+        return True
+
+    def _store_plan(self, fingerprint):
+        if fingerprint is None:
+            return
+        if any(r.status == self.ResolveFailed
+               for r in self._requirements.values()):
+            return  # could be temporary, e.g. remote not reachable
+
+        state = self._plan_state(self._plan_families())
+        self._plans.set(fingerprint,
+                        (self._requirements, self._roots, self._edges, state))
 
     def resolve_one(self, request, index=None):
         """Resolve one request and it's dependencies recursively
@@ -211,6 +426,122 @@ class RequestSolver(object):
         else:
             self._resolve_one(_request, variant_index=index)
 
+    def update(self, requests):
+        """Resolve only the difference from previously resolved requests
+
+        Unlike `resolve`, the manifest is not reset. Requests that no longer
+        given are dropped, along with requirements that nothing else depends
+        on, and newly given requests are resolved as `resolve_one`. Kept
+        requirements that have been installed since, e.g. by `run()`, are
+        marked as installed, and requests that failed or were not found are
+        resolved again. Call `reset()` for a full resolve, e.g. developer
+        packages changed.
+
+        Args:
+            requests (list): A list of (request string, variant index) tuple
+
+        Returns:
+            None
+
+        """
+        requests = [(str(request), index) for request, index in requests]
+        self._installed.refresh()
+
+        removed = [key for key in self._roots if key not in requests]
+        removed += self._drop_failed()
+        for key in removed:
+            self._roots.pop(key, None)
+        if removed:
+            self._collect_garbage()
+
+        self._check_installed()
+
+        with self._shared_pool():
+            for request, index in requests:
+                if (request, index) not in self._roots:
+                    try:
+                        self.resolve_one(request, index=index)
+                    except Exception:
+                        # partially resolved, try again on next update
+                        self._roots.pop((request, index), None)
+                        self._collect_garbage()
+                        raise
+
+    def _drop_failed(self):
+        """Drop failed requirements, return requests that lead to them
+
+        Returns:
+            list: (request, index) of requests to resolve again
+
+        """
+        failed = set(
+            id_ for id_, requested in self._requirements.items()
+            if requested.status in (self.ResolveFailed, self.PackageNotFound)
+        )
+        for id_ in failed:
+            self._requirements.pop(id_)
+            self._edges.pop(id_, None)
+        # solve failed build-time contexts again as well
+        self._contexts = {
+            key: context for key, context in self._contexts.items()
+            if context.success
+        }
+
+        return [
+            key for key, ids in self._roots.items()
+            if not failed.isdisjoint(self._reachable(ids))
+        ]
+
+    def _reachable(self, ids):
+        """Return ids of requirements that given ones depend on, inclusive"""
+        reachable = set()
+        stack = list(ids)
+        while stack:
+            id_ = stack.pop()
+            if id_ in reachable:
+                continue
+            reachable.add(id_)
+            stack.extend(self._edges.get(id_, ()))
+        return reachable
+
+    def _collect_garbage(self):
+        """Drop requirements that are not reachable from any request"""
+        reachable = self._reachable(
+            i for ids in self._roots.values() for i in ids)
+
+        for id_ in list(self._requirements):
+            if id_ not in reachable:
+                self._requirements.pop(id_)
+                self._edges.pop(id_, None)
+
+        for requested in self._requirements.values():
+            requested.depended[:] = [
+                d for d in requested.depended if d.id in reachable
+            ]
+
+    def _check_installed(self):
+        """Mark ready requirements that have been installed as installed"""
+        for requested in self._requirements.values():
+            if requested.status != self.Ready:
+                continue
+
+            package = VersionedObject(requested.name)
+            request = PackageRequest(
+                "%s==%s" % (package.name, package.version)
+                if package.version else package.name
+            )
+            developer = self.loader.find(request)
+            installed = self._find_installed(request)
+            if developer is None or installed is None:
+                continue
+
+            for d_van, i_van in self._zip_longest_variants(developer,
+                                                           installed):
+                if d_van is not None and i_van is not None \
+                        and d_van.index == requested.index:
+                    requested.status = self.Installed
+                    break
+
     @contextmanager
     def conflicts(self, *requests):
         """A context for adding conflict or weak requirements before resolve
@@ -249,13 +580,23 @@ class RequestSolver(object):
             list: A list of `Required` object
 
         """
-        return self._requirements[:]
+        return list(self._requirements.values())
+
+    def context_cache_stats(self):
+        """Return build-time context cache hit and miss counts of last resolve
+
+        Returns:
+            dict: {"hits": int, "misses": int}
+
+        """
+        return {"hits": self._contexts_hits, "misses": self._contexts_misses}
 
+    @profiled("find_installed", package=lambda self, request: request.name)
     def _find_installed(self, request):
         paths = self.installed_packages_path
-        return get_latest_package(name=request.name,
-                                  range_=request.range_,
-                                  paths=paths)
+        return self._installed.find_latest(name=request.name,
+                                           range_=request.range_,
+                                           paths=paths)
 
     def _zip_longest_variants(self, this, that):
         """Iterate two packages variants via `variant_requires`
@@ -298,7 +639,14 @@ class RequestSolver(object):
             yield this_van, that_van
 
     def _resolve_one(self, request, variant_index=None):
-        """Resolve one request and it's dependencies recursively
+        """Resolve one request and it's dependencies
+
+        Dependencies are walked depth-first with an explicit stack instead of
+        recursion. Each work item on the stack is a walker that resolves one
+        request (see `_iter_resolve`), and yields the dependencies that have
+        to be resolved before the request itself gets into manifest. A
+        request that is still being walked is not walked again, so cycles,
+        e.g. through build requires, end there.
 
         Args:
             request (PackageRequest): Package request object
@@ -307,6 +655,43 @@ class RequestSolver(object):
         Returns:
             None
 
+        """
+        walking = set()  # requests in progress, for breaking cycles
+        root_ids = self._roots[(str(request), variant_index)] = []
+        stack = [(None, self._iter_resolve(request, variant_index, None,
+                                           collect=root_ids))]
+
+        while stack:
+            item_id, walker = stack[-1]
+            try:
+                _request, index, depended = next(walker)
+            except StopIteration:
+                stack.pop()
+                walking.discard(item_id)
+                continue
+
+            item_id = (str(_request), index)
+            if item_id in walking:
+                continue
+            walking.add(item_id)
+            stack.append(
+                (item_id, self._iter_resolve(_request, index, depended))
+            )
+
+    def _iter_resolve(self, request, variant_index=None, depended=None,
+                      collect=None):
+        """Resolve one request, yield dependencies to resolve first
+
+        Args:
+            request (PackageRequest): Package request object
+            variant_index (int): Variant index, optional.
+            depended (Required): The requirement that depends on this one.
+            collect (list): Collects (name, index) of resolved variants.
+
+        Yields:
+            tuple: (PackageRequest, variant index, depended `Required`) of
+                each dependency that is not in manifest yet
+
         """
         # find latest package in requested range
         developer = self.loader.find(request)
@@ -317,6 +702,8 @@ class RequestSolver(object):
             requested = Required.get(request, from_=self._requirements)
             requested.status = self.PackageNotFound
             self._append(requested)
+            if collect is not None:
+                collect.append(requested.id)
 
             return
 
@@ -348,6 +735,7 @@ class RequestSolver(object):
         #   because installed package may have different variant sets than
         #   the developer one, even they are same version. Not likely, but
         #   could happen.
+        resolving = []
         for d_van, i_van in self._zip_longest_variants(developer, installed):
             variant = d_van or i_van
             if variant_index is not None and variant_index != variant.index:
@@ -361,8 +749,10 @@ class RequestSolver(object):
             if status == self.Ready and i_van is not None:
                 requested.status = self.Installed
 
-            if self.__depended:
-                requested.depended.append(self.__depended)
+            if depended is not None:
+                # recorded on every variant that gets resolved by request,
+                #   not only the first one.
+                requested.depended.append(depended)
 
             # resolve variant's requirement
             #
@@ -383,10 +773,54 @@ class RequestSolver(object):
                 #   from a developer package, so cannot be re-evaluated.
                 pass
 
-            variant_requires = variant.get_requires(
+            resolving.append((requested, variant))
+
+        contexts = self._resolve_variant_contexts(request, resolving)
+
+        for (requested, variant), context in zip(resolving, contexts):
+            if context is not None:
+                edges = self._edges.setdefault(requested.id, set())
+                for pkg in context.resolved_packages:
+                    request_id = (pkg.qualified_package_name, pkg.index)
+                    edges.add(request_id)
+                    if request_id in self._requirements:
+                        continue
+                    _request = PackageRequest(pkg.qualified_package_name)
+                    yield _request, pkg.index, requested
+
+            self._append(requested)
+            if collect is not None:
+                collect.append(requested.id)
+
+    @profiled("context", package=lambda self, request, _: request.name)
+    def _resolve_variant_contexts(self, request, resolving):
+        """Resolve build-time context of each variant
+
+        Args:
+            request (PackageRequest): Package request object
+            resolving (list): A list of (`Required`, `Variant`) tuple
+
+        Returns:
+            list: `ResolvedContext` of each variant, or None if failed, in
+                which case the status of `Required` is set to failed, or
+                not resolved due to `stop_at_installed`.
+
+        """
+        requires = [
+            variant.get_requires(
                 build_requires=True,
                 private_build_requires=True
             )
+            if self._expanding(requested) else None
+            for requested, variant in resolving
+        ]
+        self._presolve_contexts([r for r in requires if r is not None])
+
+        contexts = []
+        for (requested, variant), variant_requires in zip(resolving, requires):
+            if variant_requires is None:
+                contexts.append(None)
+                continue
             try:
                 context = self._resolve_build_context(variant_requires)
             except (PackageFamilyNotFoundError, PackageNotFoundError) as e:
@@ -394,6 +828,7 @@ class RequestSolver(object):
                       % join_variant_request(request, variant.index))
                 print(e)
                 requested.status = self.ResolveFailed
+                context = None
 
             else:
                 if not context.success:
@@ -401,17 +836,16 @@ class RequestSolver(object):
                           % join_variant_request(request, variant.index))
                     context.print_info()
                     requested.status = self.ResolveFailed
-                else:
-                    for pkg in context.resolved_packages:
-                        request_id = (pkg.qualified_package_name, pkg.index)
-                        if request_id in self._requirements:
-                            continue
-                        _request = PackageRequest(pkg.qualified_package_name)
-                        self.__depended = requested
-                        self._resolve_one(request=_request,
-                                          variant_index=pkg.index)
-            self._append(requested)
-        self.__depended = None  # reset
+                    context = None
+
+            contexts.append(context)
+
+        return contexts
+
+    def _expanding(self, requested):
+        if not self.stop_at_installed:
+            return True
+        return requested.status not in (self.Installed, self.External)
 
     def _resolve_build_context(self, requires):
         try:
@@ -421,16 +855,104 @@ class RequestSolver(object):
         else:
             return context
 
+    def _context_key(self, variant_requires):
+        paths = self.loader.paths + self.installed_packages_path
+        return (
+            tuple(str(r) for r in variant_requires),
+            tuple(str(r) for r in self._conflicts),
+            tuple(paths),
+        )
+
+    def _presolve_contexts(self, requires_list):
+        """Solve build-time contexts of variants in a process pool
+
+        Only if `parallel_solve_workers` is set in rez-deliver config and
+        there are more than one context that not yet solved. Solved results
+        are picked up by `_build_context` later in variant order, so the
+        manifest stays deterministic. Contexts that failed in worker process
+        are solved again in current process, see `ProcessPool`.
+
+        Args:
+            requires_list (list): build requires of each variant
+
+        """
+        if _solve_workers() < 2:
+            return
+
+        pending = OrderedDict()
+        for variant_requires in requires_list:
+            key = self._context_key(variant_requires)
+            if key in self._contexts or key in self._presolved:
+                continue
+            if self._union_context(variant_requires) is not None:
+                continue
+            pending[key] = [str(r) for r in variant_requires]
+        if len(pending) < 2:
+            return
+
+        conflicts = [str(r) for r in self._conflicts]
+        jobs = {
+            key: (requests, conflicts, self._release)
+            for key, requests in pending.items()
+        }
+        with self._shared_pool():
+            for key, context in self._pool.run(_solve_build_context, jobs):
+                self._presolved[key] = context
+
+    @contextmanager
+    def _shared_pool(self):
+        """Context that solves in one process pool, shut down on exit
+
+        The pool (and its worker processes) is started on first use, and
+        nested contexts share the outermost one. So a `resolve()` starts
+        workers at most once for all packages.
+
+        """
+        if self._pool is not None:
+            yield
+            return
+
+        self._pool = ProcessPool(_solve_workers())
+        try:
+            yield
+        finally:
+            self._pool.shutdown()
+            self._pool = None
+
     def _build_context(self, variant_requires):
         paths = self.loader.paths + self.installed_packages_path
         requests = variant_requires + self._conflicts
 
-        return ResolvedContext(
+        key = self._context_key(variant_requires)
+        context = self._contexts.get(key)
+        if context is not None:
+            self._contexts_hits += 1
+            hit("context")
+            return context
+
+        context = self._union_context(variant_requires)
+        if context is not None:
+            self._contexts_hits += 1
+            hit("context")
+            self._contexts[key] = context
+            return context
+
+        self._contexts_misses += 1
+        hit("context", False)
+        context = self._presolved.pop(key, None)
+        if context is not None:
+            self._contexts[key] = context
+            return context
+
+        context = ResolvedContext(
             requests,
             building=True,
             package_paths=paths,
             package_load_callback=self._re_evaluate_variant_callback
         )
+        self._contexts[key] = context
+
+        return context
 
     def _re_evaluate_variant_callback(self, package):
         """Package load callback in context resolving time
@@ -449,6 +971,7 @@ class RequestSolver(object):
         # patch
         package.iter_variants = partial(iter_variants, package)
 
+    @profiled("re_evaluate", package=lambda self, v, *_, **__: v.name)
     def _re_evaluate_variant(self, variant, context=None):
         """Re-evaluate package variant as in build-time
         """
@@ -456,20 +979,32 @@ class RequestSolver(object):
         if not filepath or not os.path.isfile(filepath):
             return
 
-        package = DeveloperPackage(variant.parent.resource)
-        package.filepath = filepath
+        ver_tag = variant.parent.data.get("__ver_tag__")
+        key = (
+            filepath,
+            file_hash(filepath),
+            variant.index,
+            ver_tag,
+            tuple(str(r) for r in variant.variant_requires),
+        )
+        re_evaluated_package = self._re_evaluated.get(key)
+        hit("re_evaluate", re_evaluated_package is not None)
+
+        if re_evaluated_package is None:
+            package = DeveloperPackage(variant.parent.resource)
+            package.filepath = filepath
 
-        pkg_path = os.path.dirname(filepath)
-        with override_config(self.loader.settings), os_chdir(pkg_path):
+            pkg_path = os.path.dirname(filepath)
+            with override_config(self.loader.settings), os_chdir(pkg_path):
+                with temp_env("REZ_DELIVER_PKG_PAYLOAD_VER", ver_tag):
 
-            ver_tag = package.data.get("__ver_tag__")
-            with temp_env("REZ_DELIVER_PKG_PAYLOAD_VER", ver_tag):
+                    re_evaluated_package = package.get_reevaluated({
+                        "building": True,
+                        "build_variant_index": variant.index or 0,
+                        "build_variant_requires": variant.variant_requires
+                    })
 
-                re_evaluated_package = package.get_reevaluated({
-                    "building": True,
-                    "build_variant_index": variant.index or 0,
-                    "build_variant_requires": variant.variant_requires
-                })
+            self._re_evaluated[key] = re_evaluated_package
 
         re_evaluated_package.set_context(context)
         re_evaluated_variant = re_evaluated_package.get_variant(variant.index)
@@ -477,8 +1012,71 @@ class RequestSolver(object):
         return re_evaluated_variant
 
     def _append(self, requested):
-        if requested not in self._requirements:
-            self._requirements.append(requested)
+        if requested.id not in self._requirements:
+            self._requirements[requested.id] = requested
+
+
+ResolvedVariant = namedtuple("ResolvedVariant",
+                             ["qualified_package_name", "index"])
+
+
+class SolvedContext(object):
+    """Picklable outcome of build-time context that solved in worker process
+
+    Provides the part of `ResolvedContext` interface that `RequestSolver`
+    uses.
+
+    """
+
+    def __init__(self, success, resolved_packages, info=""):
+        self.success = success
+        self.resolved_packages = resolved_packages
+        self._info = info
+
+    @classmethod
+    def from_context(cls, context):
+        resolved = [
+            ResolvedVariant(v.qualified_package_name, v.index)
+            for v in context.resolved_packages or []
+        ]
+        info = ""
+        if not context.success:
+            buf = StringIO()
+            context.print_info(buf=buf)
+            info = buf.getvalue()
+
+        return cls(context.success, resolved, info)
+
+    def print_info(self):
+        print(self._info)
+
+
+def _solve_build_context(requests, conflicts, release=False):
+    """Solve one build-time context
+
+    This is the process pool worker of `RequestSolver._presolve_contexts`.
+
+    Args:
+        requests (list): variant build requires in string
+        conflicts (list): conflict or weak requests in string
+        release (bool): solve against release packages path
+
+    Returns:
+        `SolvedContext`
+
+    """
+    solver = RequestSolver()
+    solver.loader.release = release
+    solver._release = release
+    solver._conflicts = [PackageRequest(r) for r in conflicts]
+
+    context = solver._build_context([PackageRequest(r) for r in requests])
+    return SolvedContext.from_context(context)
+
+
+def _solve_workers():
+    deliverconfig = rezconfig.plugins.command.deliver
+    return deliverconfig.get("parallel_solve_workers") or 0
 
 
 def parse_package_family_not_found_error(message):
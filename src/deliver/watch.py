@@ -0,0 +1,255 @@
+"""Invalidate loaded developer packages when their sources changed
+
+For long-running sessions like the GUI, `PackageLoader` keeps evaluated
+packages in memory. A `LoaderWatcher` watches package definition files,
+`@include` modules and family directories of loaded families, and evicts
+only the families that changed, so the next access re-loads them.
+
+Example:
+    >>> loader = PackageLoader()
+    >>> watcher = LoaderWatcher(loader)
+    >>> watcher.sync()  # watch currently loaded families
+    >>> watcher.poll()  # evict changed families
+    ['foo']
+
+Call `sync()` again after more families have been loaded. Evicted families
+are no longer watched until then.
+
+On Linux, inotify is used. Elsewhere, or if inotify is not available,
+modification times are compared on each `poll()`.
+
+"""
+import os
+import sys
+import errno
+import struct
+import ctypes
+import ctypes.util
+
+
+class _Inotify(object):
+    """Minimal non-blocking inotify binding"""
+
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM
+            | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+            | IN_MOVE_SELF)
+
+    _header = struct.Struct("iIII")
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self._libc = libc
+        self._fd = fd
+        self._wds = dict()  # wd -> dir path
+        self._paths = dict()  # dir path -> wd
+
+    def add_watch(self, path):
+        if path in self._paths:
+            return
+        wd = self._libc.inotify_add_watch(self._fd,
+                                          os.fsencode(path),
+                                          self.MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_add_watch failed")
+        # same wd is returned if the directory is watched under old path
+        self._paths.pop(self._wds.get(wd), None)
+        self._wds[wd] = path
+        self._paths[path] = wd
+
+    def rm_watch(self, path):
+        wd = self._paths.pop(path, None)
+        if wd is None:
+            return
+        del self._wds[wd]
+        # fails if the watch is already removed by kernel, which is fine
+        self._libc.inotify_rm_watch(self._fd, wd)
+
+    def watched(self):
+        return set(self._paths)
+
+    def read_events(self):
+        """Yield (dir path, entry name, mask) of all pending events"""
+        while True:
+            try:
+                buf = os.read(self._fd, 64 * 1024)
+            except OSError as e:
+                if e.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    return
+                raise
+
+            offset = 0
+            while offset < len(buf):
+                wd, mask, _, size = self._header.unpack_from(buf, offset)
+                offset += self._header.size
+                name = buf[offset:offset + size].rstrip(b"\0")
+                offset += size
+
+                path = self._wds.get(wd)
+                if path is None:
+                    continue
+
+                if mask & self.IN_IGNORED:
+                    # watch removed by kernel, e.g. directory deleted
+                    del self._wds[wd]
+                    self._paths.pop(path, None)
+                elif mask & (self.IN_DELETE_SELF | self.IN_MOVE_SELF):
+                    # directory is gone from this path, a moved directory
+                    # would still be watched under its new path
+                    self.rm_watch(path)
+
+                yield path, os.fsdecode(name), mask
+
+    def close(self):
+        os.close(self._fd)
+
+
+def _stat_key(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class LoaderWatcher(object):
+    """Evict loaded families of `PackageLoader` when their sources changed
+
+    Args:
+        loader (`PackageLoader`): the loader to watch
+        polling (bool): Compare modification times instead of using inotify.
+
+    """
+
+    def __init__(self, loader, polling=False):
+        self._loader = loader
+        self._inotify = None
+        # path -> set of (repo, family name)
+        self._files = dict()
+        self._dirs = dict()
+        # path -> stat key, for polling
+        self._stats = dict()
+
+        if not polling and sys.platform.startswith("linux"):
+            try:
+                self._inotify = _Inotify()
+            except (OSError, AttributeError, TypeError):
+                pass  # fallback to polling
+
+    @property
+    def polling(self):
+        return self._inotify is None
+
+    def sync(self):
+        """Start watching sources of all currently loaded families"""
+        self._files.clear()
+        self._dirs.clear()
+
+        for repo in self._loader._dev_repos:
+            for name, family_dir, files in repo.iter_watch_targets():
+                self._dirs.setdefault(family_dir, set()).add((repo, name))
+                for path in files:
+                    self._files.setdefault(path, set()).add((repo, name))
+
+        self._unwatch_stale()
+
+        if self._inotify is not None:
+            try:
+                for path in self._watch_dirs():
+                    if os.path.isdir(path):
+                        self._inotify.add_watch(path)
+            except OSError:
+                # e.g. exceeding max_user_watches
+                self._inotify.close()
+                self._inotify = None
+
+        if self._inotify is None:
+            for path in list(self._files) + list(self._dirs):
+                if path not in self._stats:
+                    self._stats[path] = _stat_key(path)
+
+    def poll(self):
+        """Evict changed families
+
+        Returns:
+            list: names of evicted families
+
+        """
+        affected = set()
+        for path in self._changed_paths():
+            affected.update(self._files.get(path, ()))
+            affected.update(self._dirs.get(path, ()))
+
+        evicted = set()
+        for repo, name in affected:
+            repo.evict(name)
+            evicted.add(name)
+
+        # evicted families are watched again on next `sync()`
+        self._unwatch(affected)
+
+        return sorted(evicted)
+
+    def close(self):
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def _watch_dirs(self):
+        dirs = set(self._dirs)
+        dirs.update(os.path.dirname(p) for p in self._files)
+        return dirs
+
+    def _unwatch(self, targets):
+        """Stop watching sources of given (repo, family name)"""
+        for paths in (self._files, self._dirs):
+            for path, owners in list(paths.items()):
+                owners.difference_update(targets)
+                if not owners:
+                    del paths[path]
+        self._unwatch_stale()
+
+    def _unwatch_stale(self):
+        if self._inotify is not None:
+            for path in self._inotify.watched() - self._watch_dirs():
+                self._inotify.rm_watch(path)
+        else:
+            for path in set(self._stats) - set(self._files) - set(self._dirs):
+                del self._stats[path]
+
+    def _changed_paths(self):
+        if self._inotify is not None:
+            changed = set()
+            for dirpath, name, mask in self._inotify.read_events():
+                if not name or mask & _Inotify.IN_ISDIR:
+                    # watched dir itself changed, or e.g. version dir added
+                    changed.add(dirpath)
+                if name:
+                    changed.add(os.path.join(dirpath, name))
+            return changed
+
+        changed = set()
+        for path in list(self._files) + list(self._dirs):
+            key = _stat_key(path)
+            if key != self._stats.get(path):
+                self._stats[path] = key
+                changed.add(path)
+        return changed
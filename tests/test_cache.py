@@ -0,0 +1,139 @@
+
+import os
+import time
+import unittest
+from unittest.mock import patch
+from deliver.api import PackageLoader
+from deliver.repository import DevPkgRepo
+from deliver.cache import cache_dir
+from rez.packages import get_latest_package_from_string
+from rez.package_repository import package_repository_manager
+from rez.utils.formatting import PackageRequest
+from tests.util import TestBase
+from tests.ghostwriter import early, include
+
+
+class TestCache(TestBase):
+
+    def update_settings(self):
+        self.include_path = os.path.join(self.root, "include")
+        os.makedirs(self.include_path)
+
+        self.deliver_settings["cache_root"] = os.path.join(self.root, "cache")
+        self.settings["package_definition_python_path"] = self.include_path
+
+    def _load(self, name, refresh_git_tags=False):
+        PackageLoader.clear_instance()
+        loader = PackageLoader()
+        loader.refresh_git_tags = refresh_git_tags
+        package = get_latest_package_from_string(name, paths=loader.paths)
+        return loader, package
+
+    def _touch_include(self, name, content):
+        filepath = os.path.join(self.include_path, name + ".py")
+        with open(filepath, "w") as f:
+            f.write(content)
+
+    def test_cache_root_default(self):
+        self.teardown_config()
+        self.deliver_settings.pop("cache_root")
+        self.setup_config()
+
+        # enabled by default, so build subprocesses share cached git tags
+        expected = os.path.expanduser(
+            os.path.join("~", ".cache", "rez-deliver", "git_tags"))
+        self.assertEqual(expected, cache_dir("git_tags"))
+
+    def test_cache_hit_on_reload(self):
+        self.dev_repo.add("foo", version="1")
+
+        loader, package = self._load("foo")
+        self.assertEqual("foo-1", package.qualified_name)
+        self.assertEqual({"hits": 0, "misses": 1}, loader.cache_stats())
+
+        loader, package = self._load("foo")
+        self.assertEqual("foo-1", package.qualified_name)
+        self.assertEqual({"hits": 1, "misses": 0}, loader.cache_stats())
+
+    def test_cache_invalidated_by_change(self):
+        self.dev_repo.add("foo", version="1", description="old")
+        self._load("foo")
+
+        time.sleep(0.01)
+        self.dev_repo.add("foo", version="1", description="new")
+
+        loader, package = self._load("foo")
+        self.assertEqual("new", package.description)
+        self.assertEqual({"hits": 0, "misses": 1}, loader.cache_stats())
+
+    def test_cache_invalidated_by_include_change(self):
+        self._touch_include("util", "value = 1\n")
+
+        @include("util")
+        def commands():
+            env.FOO = util.value
+
+        self.dev_repo.add("foo", version="1", commands=commands)
+        self._load("foo")
+
+        loader, _ = self._load("foo")
+        self.assertEqual({"hits": 1, "misses": 0}, loader.cache_stats())
+
+        self._touch_include("util", "value = 2\n")
+
+        loader, _ = self._load("foo")
+        self.assertEqual({"hits": 0, "misses": 1}, loader.cache_stats())
+
+    def test_cached_requires_expanded_again(self):
+        self.dev_repo.add("foo", version="1")
+        self.dev_repo.add("bar", version="1", requires=["foo-*"])
+
+        package = PackageLoader().find(PackageRequest("bar"))
+        self.assertEqual(["foo-1"], [str(r) for r in package.requires])
+
+        self.dev_repo.add("foo", version="2")
+        # as if in a new session
+        package_repository_manager.clear_caches()
+
+        PackageLoader.clear_instance()
+        loader = PackageLoader()
+        package = loader.find(PackageRequest("bar"))
+        self.assertEqual(["foo-2"], [str(r) for r in package.requires])
+        # bar and foo-1 are cached, foo-2 is new
+        self.assertEqual({"hits": 2, "misses": 1}, loader.cache_stats())
+
+    def _add_git_versioned(self):
+        @early()
+        def version():
+            import os
+            return os.getenv("REZ_DELIVER_PKG_PAYLOAD_VER", "unknown")
+        git_url = ".../davidlatwe/bar.git"
+
+        self.dev_repo.add("bar", version=version, git_url=git_url)
+
+    @patch.object(DevPkgRepo, "_git_tags", return_value=["1.0.0"])
+    def test_git_tags_cached(self, mock_git_tags):
+        self._add_git_versioned()
+
+        _, package = self._load("bar")
+        self.assertEqual("bar-1.0.0", package.qualified_name)
+        _, package = self._load("bar")
+        self.assertEqual("bar-1.0.0", package.qualified_name)
+        self.assertEqual(1, mock_git_tags.call_count)
+
+        self._load("bar", refresh_git_tags=True)
+        self.assertEqual(2, mock_git_tags.call_count)
+
+    @patch.object(DevPkgRepo, "_git_tags", return_value=["1.0.0"])
+    def test_git_tags_cache_expired(self, mock_git_tags):
+        self._update_deliver_settings(git_tags_ttl=0)
+        self._add_git_versioned()
+
+        self._load("bar")
+        time.sleep(0.01)
+        self._load("bar")
+        self.assertEqual(2, mock_git_tags.call_count)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+
+import os
+import time
+import zipfile
+import unittest
+import subprocess
+from unittest.mock import patch
+from deliver.maker import rez as rez_maker
+from tests.util import TestBase
+
+
+class TestMaker(TestBase):
+
+    def update_settings(self):
+        self.index_path = os.path.join(self.root, "index")
+        os.makedirs(self.index_path)
+
+        self.deliver_settings.update({
+            "cache_root": os.path.join(self.root, "cache"),
+            "rez_index_url": self.index_path,
+        })
+
+    def setUp(self):
+        super(TestMaker, self).setUp()
+        rez_maker._rez_version_memo.clear()
+        rez_maker._python_versions_index.clear()
+
+    def tearDown(self):
+        super(TestMaker, self).tearDown()
+        rez_maker._rez_version_memo.clear()
+        rez_maker._python_versions_index.clear()
+
+    def _add_release(self, *versions):
+        for version in versions:
+            filename = "rez-%s.tar.gz" % version
+            open(os.path.join(self.index_path, filename), "w").close()
+
+    def test_rez_version_from_local_index(self):
+        self._add_release("2.100.0", "2.114.1", "2.99.0")
+        self.assertEqual("2.114.1", rez_maker.fetch_rez_version_from_pypi())
+
+    def test_rez_version_cached(self):
+        self._add_release("2.114.1")
+        self.assertEqual("2.114.1", rez_maker.fetch_rez_version_from_pypi())
+
+        with patch.object(rez_maker, "_list_rez_index") as mock:
+            # memorized in session
+            rez_maker.fetch_rez_version_from_pypi()
+            # persistent
+            rez_maker._rez_version_memo.clear()
+            self.assertEqual("2.114.1",
+                             rez_maker.fetch_rez_version_from_pypi())
+            mock.assert_not_called()
+
+    def test_rez_version_offline(self):
+        self._update_deliver_settings(rez_version_ttl=0)
+        self._add_release("2.114.1")
+        rez_maker.fetch_rez_version_from_pypi()
+
+        time.sleep(0.01)
+        rez_maker._rez_version_memo.clear()
+        error = OSError("Network is unreachable")
+        with patch.object(rez_maker, "_list_rez_index", side_effect=error):
+            # expired, but still the last known version
+            self.assertEqual("2.114.1",
+                             rez_maker.fetch_rez_version_from_pypi())
+
+    def test_rez_version_index_unreachable(self):
+        self._update_deliver_settings(
+            rez_index_url="http://127.0.0.1:9/simple",
+            rez_index_timeout=1,
+        )
+        self.assertIsNone(rez_maker.fetch_rez_version_from_pypi())
+
+    def test_python_versions_indexed(self):
+        self.dev_repo.add("python", version="3.7.1")
+        self.dev_repo.add("python", version="3.9.0")
+
+        with patch.object(rez_maker, "iter_packages",
+                          wraps=rez_maker.iter_packages) as mock:
+            self.assertEqual(["3.7", "3.9"],
+                             rez_maker.find_python_package_versions(False))
+            self.assertEqual(["3.7", "3.9"],
+                             rez_maker.find_python_package_versions(False))
+            self.assertEqual(1, mock.call_count)
+
+            # python family changed, looked up again
+            self.dev_repo.add("python", version="3.10.2")
+            os.utime(os.path.join(self.dev_repo.path, "python"), ns=(0, 0))
+            rez_maker.find_python_package_versions(False)
+            self.assertEqual(2, mock.call_count)
+
+    def test_rez_wheel_shared(self):
+        wheelhouse = os.path.join(self.root, "cache", "wheels")
+        built = []
+
+        def check_call(args, **kwargs):
+            self.assertIn("wheel", args)
+            built.append(args)
+            wheel = os.path.join(wheelhouse, "rez-2.114.1-py3-none-any.whl")
+            with zipfile.ZipFile(wheel, "w") as archive:
+                archive.writestr("rez/__init__.py", "")
+                archive.writestr("rezplugins/__init__.py", "")
+
+        with patch.object(rez_maker.subprocess, "check_call",
+                          side_effect=check_call):
+            for py_ver in ["3.10", "3.11"]:
+                rez_maker.build_rez_via_pip(self.install_path,
+                                            "rez==2.114.1",
+                                            "2.114.1",
+                                            python_version=py_ver)
+
+        # built once, from configured local index
+        self.assertEqual(1, len(built))
+        self.assertIn(wheelhouse, built[0])
+        self.assertIn(self.index_path, built[0])
+
+        # unpacked once, and every variant is linked from there
+        unpacked = os.path.join(wheelhouse, "unpacked")
+        self.assertEqual(["rez-2.114.1-py3-none-any"], os.listdir(unpacked))
+        shared = os.path.join(unpacked, "rez-2.114.1-py3-none-any",
+                              "rez", "__init__.py")
+        installed = [
+            os.path.join(root, "rez", "__init__.py")
+            for root, dirs, _ in os.walk(
+                os.path.join(self.install_path, "rez", "2.114.1"))
+            if "rez" in dirs and "rezplugins" in dirs
+        ]
+        self.assertEqual(2, len(installed))
+        for path in installed:
+            self.assertTrue(os.path.samefile(shared, path))
+
+    def test_find_rez_wheel(self):
+        wheelhouse = os.path.join(self.root, "wheels")
+        os.makedirs(wheelhouse)
+        for name in ["rez-2.100.0-py2.py3-none-any.whl",
+                     "rez-2.114.1-py3-none-any.whl",
+                     "rez-3.0.0-py3-none-any.whl"]:
+            open(os.path.join(wheelhouse, name), "w").close()
+
+        def find(rez_version, python_version=None):
+            wheel = rez_maker._find_rez_wheel(wheelhouse,
+                                              rez_version,
+                                              python_version)
+            return os.path.basename(wheel) if wheel else None
+
+        self.assertEqual("rez-2.114.1-py3-none-any.whl", find("2", "3.7"))
+        self.assertEqual("rez-2.100.0-py2.py3-none-any.whl",
+                         find("2", "2.7"))
+        self.assertEqual("rez-3.0.0-py3-none-any.whl", find("3"))
+        self.assertIsNone(find("2.99"))
+
+    def test_link_or_copy(self):
+        src = os.path.join(self.root, "src.py")
+        dst = os.path.join(self.root, "dst.py")
+        with open(src, "w") as f:
+            f.write("pass\n")
+
+        rez_maker._link_or_copy(src, dst)
+        self.assertTrue(os.path.samefile(src, dst))
+
+
+if __name__ == "__main__":
+    unittest.main()
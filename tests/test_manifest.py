@@ -1,12 +1,18 @@
 
 import os
-import time
-import shutil
-import tempfile
+import sys
+import argparse
+import json
+import inspect
 import unittest
 from unittest.mock import patch
 from deliver.api import PackageLoader, PackageInstaller
+from deliver import solve, repository, profiler, lib
 from deliver.repository import DevPkgRepo
+from deliver.exceptions import RezDeliverRequestError
+from rez.developer_package import DeveloperPackage
+from rez.package_repository import package_repository_manager
+from rez.utils.formatting import PackageRequest
 from deliver.lib import temp_env, override_config
 from tests.util import TestBase, require_directives
 from tests.ghostwriter import DeveloperRepository, early, late, building
@@ -14,44 +20,17 @@ from tests.ghostwriter import DeveloperRepository, early, late, building
 
 class TestManifest(TestBase):
 
+    def update_settings(self):
+        self.release_path = os.path.join(self.root, "release")
+        self.settings.update({
+            "packages_path": [self.install_path, self.release_path],
+            "release_packages_path": self.release_path,
+        })
+
     def setUp(self):
-        root = tempfile.mkdtemp(prefix="rez_deliver_test_")
-        install_path = os.path.join(root, "install")
-        release_path = os.path.join(root, "release")
-        dev_repo_path = os.path.join(root, "developer")
-
-        self.root = root
-        self.install_path = install_path
-        self.release_path = release_path
-        self.dev_repo_path = dev_repo_path
-        self.dev_repo = DeveloperRepository(dev_repo_path)
-        self.settings = {
-            "packages_path": [install_path, release_path],
-            "local_packages_path": install_path,
-            "release_packages_path": release_path,
-            "plugins": {
-                "command": {"deliver": {
-                    "dev_repository_roots": [dev_repo_path]
-                }}
-            }
-        }
         super(TestManifest, self).setUp()
-
-        PackageLoader.clear_instance()
         self.installer = PackageInstaller(PackageLoader())
 
-    def tearDown(self):
-        # from rez.serialise import clear_file_caches
-        retries = 5
-        if os.path.exists(self.root):
-            for i in range(retries):
-                try:
-                    shutil.rmtree(self.root)
-                    break
-                except Exception:
-                    if i < (retries - 1):
-                        time.sleep(0.2)
-
     def _run_install(self):
         # ensure module `deliver.install` can be accessed in subprocess.
         #
@@ -88,6 +67,32 @@ class TestManifest(TestBase):
         self.assertEqual("goo-1", manifest[2].name)
         self.assertEqual(("bar-1", 1), (manifest[3].name, manifest[3].index))
 
+    def test_resolve_shared_variant(self):
+        self.dev_repo.add("foo", version="1")
+        self.dev_repo.add("goo", version="1")
+        self.dev_repo.add("base", version="1", variants=[["foo"], ["goo"]])
+        self.dev_repo.add("left", version="1", requires=["base"])
+        self.dev_repo.add("right", version="1", requires=["base", "goo"])
+        self.dev_repo.add("top", version="1", requires=["left", "right"])
+
+        # base-1[1] is reached from both left and right
+        expected = [
+            ("goo-1", None),
+            ("base-1", 1),
+            ("left-1", None),
+            ("right-1", None),
+            ("top-1", None),
+        ]
+
+        self.installer.resolve("top")
+        manifest = self.installer.manifest()
+        self.assertEqual(expected, [(q.name, q.index) for q in manifest])
+
+        # reaching it again through another root adds nothing
+        self.installer.resolve_one("right")
+        manifest = self.installer.manifest()
+        self.assertEqual(expected, [(q.name, q.index) for q in manifest])
+
     def test_resolve_with_req_expansion(self):
         # need to install bar first so the wildcard request can be expanded.
         installed_repo = DeveloperRepository(self.install_path)
@@ -251,6 +256,319 @@ class TestManifest(TestBase):
             else:
                 self.assertEqual(self.installer.Ready, req.status)
 
+    def test_stop_at_installed(self):
+        installed_repo = DeveloperRepository(self.install_path)
+        installed_repo.add("ext", private_build_requires=["bar"])
+
+        self.dev_repo.add("foo", requires=["ext"])
+        self.dev_repo.add("bar")
+
+        self.installer.resolve("foo")
+        manifest = self.installer.manifest()
+        self.assertEqual(["bar", "ext", "foo"], [r.name for r in manifest])
+
+        self.installer.stop_at_installed = True
+        self.installer.resolve("foo")
+        manifest = self.installer.manifest()
+        self.assertEqual(["ext", "foo"], [r.name for r in manifest])
+        self.assertEqual(self.installer.External, manifest[0].status)
+
+    def test_installed_index(self):
+        installed_repo = DeveloperRepository(self.install_path)
+        installed_repo.add("foo", version="1")
+        self.dev_repo.add("bar", version="1", requires=["foo"])
+
+        iter_packages = repository.iter_packages
+        with patch.object(repository, "iter_packages",
+                          wraps=iter_packages) as mock:
+            self.installer.resolve("bar")
+            self.installer.resolve("bar")
+            self.assertEqual(2, mock.call_count)  # foo and bar, once
+
+            # newly installed version is picked up
+            installed_repo.add("foo", version="2")
+            os.utime(os.path.join(self.install_path, "foo"), ns=(0, 0))
+            self.installer.resolve("foo")
+            self.assertEqual(3, mock.call_count)
+
+        manifest = self.installer.manifest()
+        self.assertEqual("foo-2", manifest[0].name)
+        self.assertEqual(self.installer.External, manifest[0].status)
+
+    def test_incremental_update(self):
+        self.dev_repo.add("foo", version="1")
+        self.dev_repo.add("bar", version="1", requires=["foo"])
+        self.dev_repo.add("egg", version="1")
+        self.dev_repo.add("nut", version="1", requires=["egg"])
+
+        self.installer.update([("bar", None)])
+        manifest = self.installer.manifest()
+        self.assertEqual(["foo-1", "bar-1"], [r.name for r in manifest])
+
+        with patch.object(self.installer, "_iter_resolve",
+                          wraps=self.installer._iter_resolve) as mock:
+            self.installer.update([("bar", None), ("nut", None)])
+            # only nut and egg are resolved
+            self.assertEqual(2, mock.call_count)
+
+        manifest = self.installer.manifest()
+        self.assertEqual(["foo-1", "bar-1", "egg-1", "nut-1"],
+                         [r.name for r in manifest])
+
+        # bar removed, foo is no longer needed
+        self.installer.update([("nut", None)])
+        manifest = self.installer.manifest()
+        self.assertEqual(["egg-1", "nut-1"], [r.name for r in manifest])
+
+    def test_update_after_install(self):
+        self.dev_repo.add("foo", version="1", build_command=False)
+        self.dev_repo.add("bar", version="1", requires=["foo"],
+                          build_command=False)
+
+        self.installer.update([("foo", None)])
+        self._run_install()
+
+        self.installer.update([("foo", None), ("bar", None)])
+        manifest = self.installer.manifest()
+        self.assertEqual(["foo-1", "bar-1"], [r.name for r in manifest])
+        self.assertEqual(self.installer.Installed, manifest[0].status)
+        self.assertEqual(self.installer.Ready, manifest[1].status)
+
+    def test_update_prune_depended(self):
+        self.dev_repo.add("foo", version="1")
+        self.dev_repo.add("bar", version="1", requires=["foo"])
+        self.dev_repo.add("egg", version="1", requires=["foo"])
+
+        self.installer.update([("bar", None), ("egg", None)])
+        foo = self.installer.manifest()[0]
+        self.assertEqual(["bar-1"], [d.name for d in foo.depended])
+
+        self.installer.update([("egg", None)])
+        manifest = self.installer.manifest()
+        self.assertEqual(["foo-1", "egg-1"], [r.name for r in manifest])
+        # dropped bar is no longer referenced
+        self.assertEqual([], manifest[0].depended)
+
+    def test_update_retry_failed(self):
+        self.dev_repo.add("bar", version="1", requires=["foo"])
+        self.dev_repo.add("egg", version="1")
+
+        self.installer.update([("bar", None), ("egg", None)])
+        manifest = self.installer.manifest()
+        self.assertEqual(["bar-1", "egg-1"], [r.name for r in manifest])
+        self.assertEqual(self.installer.ResolveFailed, manifest[0].status)
+
+        # foo is here now, bar gets resolved again
+        self.dev_repo.add("foo", version="1")
+        self.installer.update([("bar", None), ("egg", None)])
+        manifest = self.installer.manifest()
+        self.assertEqual(["egg-1", "foo-1", "bar-1"],
+                         [r.name for r in manifest])
+        self.assertEqual(self.installer.Ready, manifest[1].status)
+
+    def test_build_time_cycle(self):
+        # foo needs bar to build, bar needs foo at runtime
+        self.dev_repo.add("foo", version="1", private_build_requires=["bar"])
+        self.dev_repo.add("bar", version="1", requires=["foo"])
+
+        # no endless walk, and each one only once
+        for request in ("foo", "bar"):
+            self.installer.resolve(request)
+            manifest = self.installer.manifest()
+            self.assertEqual(["bar-1", "foo-1"],
+                             sorted(r.name for r in manifest))
+
+    def test_deep_dependency_chain(self):
+        depth = 150
+        for i in range(depth):
+            requires = ["pkg%d" % (i + 1)] if i + 1 < depth else []
+            self.dev_repo.add("pkg%d" % i, version="1",
+                              private_build_requires=requires)
+
+        # not enough for walking the chain recursively
+        limit = sys.getrecursionlimit()
+        self.addCleanup(sys.setrecursionlimit, limit)
+        sys.setrecursionlimit(len(inspect.stack()) + 200)
+
+        self.installer.resolve("pkg0")
+        manifest = self.installer.manifest()
+        self.assertEqual(["pkg%d-1" % i for i in reversed(range(depth))],
+                         [r.name for r in manifest])
+
+    def test_resolve_plan_restored(self):
+        self._update_deliver_settings(
+            cache_root=os.path.join(self.root, "cache"))
+
+        self.dev_repo.add("foo", version="1")
+        self.dev_repo.add("bar", version="1", requires=["foo"])
+
+        def resolve():
+            installer = PackageInstaller(PackageLoader())
+            with patch.object(installer, "_resolve_one",
+                              wraps=installer._resolve_one) as mock:
+                installer.resolve("bar")
+            names = [r.name for r in installer.manifest()]
+            return names, mock.call_count
+
+        self.assertEqual((["foo-1", "bar-1"], 1), resolve())
+        with patch.object(DevPkgRepo, "prefetch_git_tags") as mock:
+            self.assertEqual((["foo-1", "bar-1"], 0), resolve())
+            # nothing to fetch for restored plan
+            mock.assert_not_called()
+
+        # developer package changed
+        self.dev_repo.add("foo", version="1", description="changed")
+        self.assertEqual((["foo-1", "bar-1"], 1), resolve())
+
+        # installed repository changed
+        installed_repo = DeveloperRepository(self.install_path)
+        installed_repo.add("foo", version="2")
+        self.assertEqual(1, resolve()[1])
+
+    def test_resolve_plan_variant_installed(self):
+        self._update_deliver_settings(
+            cache_root=os.path.join(self.root, "cache"))
+        self.installer = PackageInstaller(PackageLoader())
+
+        self.dev_repo.add("foo", version="1", build_command=False)
+        self.dev_repo.add("foo", version="2", build_command=False)
+        self.dev_repo.add("bar", version="5", build_command=False,
+                          variants=[["foo-1"], ["foo-2"]])
+
+        self.installer.resolve("foo-1", "foo-2", "bar[0]")
+        self._run_install()
+
+        self.installer.resolve("bar")
+        self.assertEqual(self.installer.Ready,
+                         self.installer.manifest()[-1].status)
+
+        # another variant installed into the same version directory, which
+        #   may leave repository root and family directory untouched.
+        dirs = [self.install_path, os.path.join(self.install_path, "bar")]
+        mtimes = [os.stat(d).st_mtime_ns for d in dirs]
+        self.installer.resolve("bar[1]")
+        self._run_install()
+        for dirpath, mtime in zip(dirs, mtimes):
+            os.utime(dirpath, ns=(mtime, mtime))
+
+        self.installer.resolve("bar")
+        manifest = self.installer.manifest()
+        self.assertEqual(("bar-5", 1), manifest[-1].id)
+        self.assertEqual(self.installer.Installed, manifest[-1].status)
+
+    @patch.object(DevPkgRepo, "_git_tags", return_value=["1.0.0"])
+    def test_resolve_plan_git_tags_changed(self, mock_git_tags):
+        self._update_deliver_settings(
+            cache_root=os.path.join(self.root, "cache"),
+            git_tags_ttl=0,
+        )
+
+        @early()
+        def version():
+            import os
+            return os.getenv("REZ_DELIVER_PKG_PAYLOAD_VER", "unknown")
+        git_url = ".../davidlatwe/bar.git"
+
+        self.dev_repo.add("bar", version=version, git_url=git_url)
+
+        def resolve():
+            # new session
+            package_repository_manager.clear_caches()
+            PackageLoader.clear_instance()
+            installer = PackageInstaller(PackageLoader())
+            with patch.object(installer, "_resolve_one",
+                              wraps=installer._resolve_one) as mock:
+                installer.resolve("bar")
+            names = [r.name for r in installer.manifest()]
+            return names, mock.call_count
+
+        self.assertEqual((["bar-1.0.0"], 1), resolve())
+        self.assertEqual((["bar-1.0.0"], 0), resolve())
+
+        # new tag pushed to remote
+        mock_git_tags.return_value = ["1.0.0", "2.0.0"]
+        self.assertEqual((["bar-2.0.0"], 1), resolve())
+
+    def test_combined_solve(self):
+        self.dev_repo.add("py", version="3")
+        self.dev_repo.add("lib", version="1", requires=["py"])
+        self.dev_repo.add("a", version="1", requires=["lib", "py"])
+        self.dev_repo.add("b", version="1", requires=["lib"])
+        self.dev_repo.add("c", version="1", requires=["py"],
+                          private_build_requires=["cmake"])
+        self.dev_repo.add("cmake", version="3")
+
+        self.installer.resolve("a", "b", "c")
+        separately = [r.name for r in self.installer.manifest()]
+        stats = self.installer.context_cache_stats()
+
+        self.installer.combined_solve = True
+        self.installer.resolve("a", "b", "c")
+        together = [r.name for r in self.installer.manifest()]
+        combined_stats = self.installer.context_cache_stats()
+
+        self.assertEqual(separately, together)
+        self.assertEqual(5, stats["misses"])
+        # the combined one, and c (private build requires not in there)
+        self.assertEqual(2, combined_stats["misses"])
+
+    def test_combined_solve_pinned(self):
+        self.dev_repo.add("py", version="2")
+        self.dev_repo.add("py", version="3")
+        self.dev_repo.add("a", version="1", requires=["py"])
+        self.dev_repo.add("b", version="1", requires=["py-2"])
+
+        self.installer.combined_solve = True
+        self.installer.resolve("a", "b")
+
+        # py-2 pinned by b in combined solve, not taken for a
+        context = self.installer._build_context([PackageRequest("py")])
+        self.assertEqual(["py-3"],
+                         [v.qualified_package_name
+                          for v in context.resolved_packages])
+
+    def test_profile(self):
+        self.dev_repo.add("foo", version="1")
+        self.dev_repo.add("bar", version="1", requires=["foo"])
+
+        prof = profiler.enable()
+        self.addCleanup(profiler.disable)
+        self.installer.resolve("bar")
+        self.assertIs(prof, profiler.disable())
+
+        report = prof.report()
+        for phase in ("find", "find_installed", "context", "re_evaluate"):
+            self.assertIn(phase, report["phases"])
+        self.assertEqual(2, report["phases"]["context"]["calls"])
+        self.assertEqual({"bar", "foo"}, set(report["packages"]))
+
+        filepath = os.path.join(self.root, "profile.json")
+        prof.write_json(filepath)
+        with open(filepath) as f:
+            self.assertEqual(report["phases"], json.load(f)["phases"])
+
+        # turned off
+        self.installer.resolve("bar")
+        self.assertEqual(2, prof.report()["phases"]["context"]["calls"])
+
+    def test_profile_cli(self):
+        from deliver import cli
+        from deliver.rezplugins.command import deliver
+
+        parser = argparse.ArgumentParser("deliver")
+        deliver.setup_parser(parser)
+        opts = parser.parse_args(["--profile", "foo"])
+        self.assertTrue(opts.profile)
+        self.assertEqual(["foo"], opts.PKG)
+
+        # profiler stopped even if resolve failed
+        error = RezDeliverRequestError("failed")
+        with patch.object(PackageInstaller, "resolve", side_effect=error):
+            with self.assertRaises(RezDeliverRequestError):
+                cli.deploy_packages(["foo"], self.install_path,
+                                    dry_run=True, profile=True)
+        self.assertIsNone(profiler.active())
+
     def test_buildtime_variants(self):
         @early()
         def variants():
@@ -343,6 +661,74 @@ class TestManifest(TestBase):
 
         self.assertEqual("bar-1.0.0", manifest[0].name)
 
+    def test_build_context_reused(self):
+        self.dev_repo.add("foo", version="1")
+        self.dev_repo.add("bar", version="1", requires=["foo"])
+        self.dev_repo.add("egg", version="1", requires=["foo"])
+
+        self.installer.resolve("bar", "egg")
+        manifest = self.installer.manifest()
+        self.assertEqual(["foo-1", "bar-1", "egg-1"],
+                         [r.name for r in manifest])
+        self.assertEqual({"hits": 1, "misses": 2},
+                         self.installer.context_cache_stats())
+
+    def test_re_evaluated_variant_reused(self):
+        self.dev_repo.add("foo", version="1")
+        self.dev_repo.add("bar", version="1", requires=["foo"])
+        self.dev_repo.add("egg", version="1", requires=["foo", "bar"])
+
+        get_reevaluated = DeveloperPackage.get_reevaluated
+        with patch.object(DeveloperPackage, "get_reevaluated",
+                          autospec=True, side_effect=get_reevaluated) as mock:
+            self.installer.resolve("egg")
+            # once per developer package variant
+            self.assertEqual(3, mock.call_count)
+
+        manifest = self.installer.manifest()
+        self.assertEqual(["foo-1", "bar-1", "egg-1"],
+                         [r.name for r in manifest])
+
+    def test_parallel_variant_contexts(self):
+        self.dev_repo.add("foo", version="1")
+        self.dev_repo.add("foo", version="2")
+        self.dev_repo.add("egg", version="1")
+        self.dev_repo.add("bar", version="1",
+                          variants=[["foo-1"], ["foo-2"], ["egg"]])
+
+        self.installer.resolve("bar")
+        serial = [(r.name, r.index) for r in self.installer.manifest()]
+
+        self._update_deliver_settings(parallel_solve_workers=2)
+        with patch.object(solve, "ResolvedContext",
+                          wraps=solve.ResolvedContext) as mock:
+            self.installer.resolve("bar")
+            # variants of bar solved in worker processes
+            self.assertEqual(1, mock.call_count)
+        parallel = [(r.name, r.index) for r in self.installer.manifest()]
+
+        self.assertEqual(serial, parallel)
+        self.assertEqual(3, len([n for n, _ in parallel if n == "bar-1"]))
+        self.assertEqual(
+            {"hits": 2, "misses": 4}, self.installer.context_cache_stats())
+
+    def test_parallel_contexts_one_pool(self):
+        self.dev_repo.add("foo", version="1")
+        self.dev_repo.add("foo", version="2")
+        self.dev_repo.add("egg", version="1")
+        self.dev_repo.add("bar", version="1",
+                          variants=[["foo-1"], ["foo-2"]])
+        self.dev_repo.add("nut", version="1",
+                          variants=[["foo-1"], ["egg"]], requires=["bar"])
+
+        self._update_deliver_settings(parallel_solve_workers=2)
+        with patch.object(lib, "ProcessPoolExecutor",
+                          wraps=lib.ProcessPoolExecutor) as mock:
+            self.installer.resolve("nut")
+            # variants of nut and bar solved in the same workers
+            self.assertEqual(1, mock.call_count)
+        self.assertIsNone(self.installer._pool)
+
     def test_expanding_maker_package(self):
         self.dev_repo.add("a", requires=["platform-*"])
 
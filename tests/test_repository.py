@@ -0,0 +1,570 @@
+
+import os
+import sys
+import shutil
+import unittest
+import threading
+import subprocess
+from unittest.mock import patch
+from rez.utils.formatting import PackageRequest
+from rez.package_repository import package_repository_manager
+from deliver.api import PackageLoader
+from deliver import repository, _rezcompat
+from deliver.repository import DevPkgRepo
+from deliver.watch import LoaderWatcher
+from deliver.exceptions import RezDeliverFatalError
+from deliver.lib import override_config, os_chdir, temp_env
+from rez.developer_package import DeveloperPackage
+from tests.util import TestBase
+from tests.ghostwriter import DeveloperRepository, early, include
+
+
+class TestRepository(TestBase):
+
+    def _dev_repo(self, loader):
+        return next(r for r in loader._dev_repos
+                    if isinstance(r, DevPkgRepo))
+
+    def test_parallel_preload(self):
+        self._update_deliver_settings(parallel_load_workers=2)
+
+        self.dev_repo.add("foo", version="1")
+        self.dev_repo.add("foo", version="2")
+        self.dev_repo.add("bar", version="1", requires=["foo"])
+
+        loader = PackageLoader()
+        loader.preload()
+
+        repo = self._dev_repo(loader)
+        self.assertEqual({"foo", "bar"}, set(repo._loaded_cache))
+        self.assertEqual({"1", "2"}, set(repo._loaded_cache["foo"]))
+
+        package = next(loader.iter_packages("bar"))
+        self.assertEqual("bar-1", package.qualified_name)
+
+    def test_serial_preload_is_noop(self):
+        self.dev_repo.add("foo", version="1")
+        self.dev_repo.add("bar", version="1")
+
+        loader = PackageLoader()
+        loader.preload()
+
+        repo = self._dev_repo(loader)
+        self.assertEqual(0, len(repo._loaded_cache))
+
+    def test_loaded_cache_budget(self):
+        self._update_deliver_settings(loaded_cache_budget_mb=0.001)  # ~1KB
+
+        for name in ("foo", "bar", "egg"):
+            self.dev_repo.add(name, version="1", description="x" * 600)
+
+        loader = PackageLoader()
+        repo = self._dev_repo(loader)
+        for name in ("foo", "bar", "egg"):
+            loader.find(PackageRequest(name))
+
+        self.assertNotIn("foo", repo._loaded_cache)
+        self.assertIn("egg", repo._loaded_cache)
+        self.assertLessEqual(len(repo._loaded_cache), 2)
+
+        # evicted family gets re-loaded on demand
+        package = loader.find(PackageRequest("foo"))
+        self.assertEqual("foo-1", package.qualified_name)
+        self.assertIn("foo", repo._loaded_cache)
+
+    def test_loaded_cache_budget_release_evicted_only(self):
+        self._update_deliver_settings(loaded_cache_budget_mb=0.001)  # ~1KB
+
+        for name in ("foo", "bar"):
+            self.dev_repo.add(name, version="1", description="x" * 600)
+
+        loader = PackageLoader()
+        repo = self._dev_repo(loader)
+        foo = loader.find(PackageRequest("foo"))
+        foo.validate_data()
+
+        bar = loader.find(PackageRequest("bar"))
+        bar.validate_data()
+
+        self.assertNotIn("foo", repo._loaded_cache)
+        self.assertNotIn("_data", vars(foo.resource))
+        self.assertIn("_data", vars(bar.resource))
+
+        # released resource loads again on access
+        self.assertEqual("x" * 600, foo.description)
+
+    @patch.object(DevPkgRepo, "_git_tags",
+                  return_value=["1.0.0", "1.1.0", "1.2.0"])
+    def test_loaded_cache_budget_measure_evaluated(self, _):
+        self._update_deliver_settings(loaded_cache_budget_mb=1)
+        self._add_git_versioned("bar", ".../davidlatwe/bar.git")
+        loader = PackageLoader()
+
+        with patch.object(repository, "_estimate_size",
+                          wraps=repository._estimate_size) as mock:
+            for package in loader.iter_packages("bar"):
+                package.validate_data()
+            # each version is measured once, when it gets evaluated
+            self.assertEqual(3, mock.call_count)
+
+    def test_family_index(self):
+        self.dev_repo.add("foo", version="1")
+        self.dev_repo.add("bar", version="1")
+
+        with patch.object(repository, "iter_package_families",
+                          wraps=repository.iter_package_families) as mock:
+            loader = PackageLoader()
+            repo = self._dev_repo(loader)
+
+            self.assertTrue(repo.has_package("foo"))
+            self.assertTrue(repo.has_package("bar"))
+            self.assertFalse(repo.has_package("egg"))
+            self.assertEqual(1, len(list(repo.get_dev_package_versions("foo"))))
+            self.assertEqual(1, mock.call_count)
+
+            # root dir modified, index gets refreshed
+            self.dev_repo.add("egg", version="1")
+            os.utime(self.dev_repo_path, ns=(0, 0))
+
+            self.assertTrue(repo.has_package("egg"))
+            self.assertEqual(2, mock.call_count)
+
+    def test_scan_roots_concurrently(self):
+        other_path = os.path.join(self.root, "other")
+        other_repo = DeveloperRepository(other_path)
+        self._update_deliver_settings(
+            dev_repository_roots=[self.dev_repo_path, other_path])
+
+        self.dev_repo.add("foo", version="1", description="mine")
+        other_repo.add("foo", version="1", description="shared")
+        other_repo.add("bar", version="1")
+
+        # would time out if roots were scanned one after another
+        barrier = threading.Barrier(2, timeout=5)
+
+        def listing(*args, **kwargs):
+            barrier.wait()
+            return repository_iter_package_families(*args, **kwargs)
+
+        repository_iter_package_families = repository.iter_package_families
+        with patch.object(repository, "iter_package_families", listing):
+            loader = PackageLoader()
+
+        names = list(loader.iter_package_family_names())
+        self.assertEqual(["foo", "bar"], names[:2])
+        self.assertEqual(1, names.count("foo"))
+        package = loader.find(PackageRequest("foo"))
+        self.assertEqual("mine", package.description)
+
+    def test_lazy_package_makers(self):
+        module_dir = os.path.join(self.root, "makers")
+        os.makedirs(module_dir)
+        with open(os.path.join(module_dir, "_test_maker_foo.py"), "w") as f:
+            f.write(
+                "from rez.package_maker import PackageMaker\n"
+                "def pkg_foo(*_args, **_kwargs):\n"
+                "    maker = PackageMaker('foo')\n"
+                "    maker.version = '1.0'\n"
+                "    return maker\n"
+            )
+        sys.path.insert(0, module_dir)
+        self.addCleanup(sys.path.remove, module_dir)
+        self.addCleanup(sys.modules.pop, "_test_maker_foo", None)
+
+        self._update_deliver_settings(package_makers={
+            "foo": "_test_maker_foo:pkg_foo",
+            "rez": None,
+        })
+
+        loader = PackageLoader()
+        names = list(loader.iter_package_family_names())
+        self.assertIn("foo", names)
+        self.assertNotIn("rez", names)
+        self.assertNotIn("_test_maker_foo", sys.modules)
+
+        package = loader.find(PackageRequest("foo"))
+        self.assertEqual("foo-1.0", package.qualified_name)
+        self.assertIn("_test_maker_foo", sys.modules)
+
+    def test_package_maker_unavailable(self):
+        self._update_deliver_settings(package_makers={
+            "foo": "_test_no_such_module:pkg_foo",
+            "bar": "deliver.maker.os:no_such_maker",
+        })
+        self.dev_repo.add("egg", version="1")
+
+        loader = PackageLoader()
+        self.assertIsNone(loader.find(PackageRequest("foo")))
+        self.assertIsNone(loader.find(PackageRequest("bar")))
+        self.assertEqual("egg-1",
+                         loader.find(PackageRequest("egg")).qualified_name)
+
+        names = list(loader.iter_package_family_names())
+        self.assertNotIn("foo", names)
+        self.assertNotIn("bar", names)
+
+    def test_catalog(self):
+        self.dev_repo.add("foo", version="1")
+        self.dev_repo.add("bar", version="1", requires=["foo"])
+
+        catalogs = PackageLoader().build_catalog()
+        self.assertEqual(1, len(catalogs))
+        self.assertTrue(os.path.isfile(catalogs[0]))
+
+        PackageLoader.clear_instance()
+        loader = PackageLoader()
+
+        with patch.object(_rezcompat, "load_package_file",
+                          wraps=_rezcompat.load_package_file) as mock:
+            package = loader.find(PackageRequest("bar"))
+            self.assertEqual("bar-1", package.qualified_name)
+            self.assertEqual(os.path.join(self.dev_repo_path, "bar", "1",
+                                          "package.py"),
+                             package.data["__source__"])
+            mock.assert_not_called()
+
+            # outdated
+            self.dev_repo.add("foo", version="1", description="changed")
+            package = loader.find(PackageRequest("foo"))
+            self.assertEqual("changed", package.description)
+            self.assertEqual(1, mock.call_count)
+
+    def test_catalog_requires_expanded_on_load(self):
+        self.dev_repo.add("foo", version="1")
+        self.dev_repo.add("bar", version="1", requires=["foo-*", "os-*"])
+        PackageLoader().build_catalog()
+
+        # the catalog is used on another machine
+        self.dev_repo.add("foo", version="2")
+        package_repository_manager.clear_caches()
+        PackageLoader.clear_instance()
+        loader = PackageLoader()
+
+        with patch.object(_rezcompat, "load_package_file",
+                          wraps=_rezcompat.load_package_file) as mock:
+            package = loader.find(PackageRequest("bar"))
+            self.assertEqual("foo-2", str(package.requires[0]))
+
+            # only outdated foo was loaded from file
+            loaded = [os.path.relpath(c.args[0], self.dev_repo_path)
+                      for c in mock.call_args_list]
+            self.assertEqual([], [p for p in loaded if p.startswith("bar")])
+
+    def test_catalog_include_relocated(self):
+        include_path = os.path.join(self.root, "include")
+        os.makedirs(include_path)
+        with open(os.path.join(include_path, "util.py"), "w") as f:
+            f.write("value = 1\n")
+        self.teardown_config()
+        self.settings["package_definition_python_path"] = include_path
+        self.setup_config()
+
+        @include("util")
+        def commands():
+            env.FOO = util.value
+
+        self.dev_repo.add("foo", version="1", commands=commands)
+        PackageLoader().build_catalog()
+
+        # same include module at a different location
+        relocated = os.path.join(self.root, "relocated")
+        shutil.copytree(include_path, relocated)
+        self.teardown_config()
+        self.settings["package_definition_python_path"] = relocated
+        self.setup_config()
+        PackageLoader.clear_instance()
+
+        repo = self._dev_repo(PackageLoader())
+        family = repo._family_index()["foo"]
+        self.assertTrue(repo._load_from_catalog(family))
+
+        with open(os.path.join(relocated, "util.py"), "w") as f:
+            f.write("value = 2\n")
+        self.assertFalse(repo._load_from_catalog(family))
+
+    def _test_watcher(self, polling):
+        self.dev_repo.add("foo", version="1", description="old")
+        self.dev_repo.add("bar", version="1")
+
+        loader = PackageLoader()
+        repo = self._dev_repo(loader)
+        loader.find(PackageRequest("foo"))
+        loader.find(PackageRequest("bar"))
+
+        watcher = LoaderWatcher(loader, polling=polling)
+        self.addCleanup(watcher.close)
+        self.assertEqual(polling, watcher.polling)
+        watcher.sync()
+        self.assertEqual([], watcher.poll())
+
+        self.dev_repo.add("foo", version="1", description="new")
+
+        self.assertEqual(["foo"], watcher.poll())
+        self.assertNotIn("foo", repo._loaded_cache)
+        self.assertIn("bar", repo._loaded_cache)
+
+        package = loader.find(PackageRequest("foo"))
+        self.assertEqual("new", package.description)
+
+        # new version added into family
+        watcher.sync()
+        self.dev_repo.add("foo", version="2")
+
+        self.assertEqual(["foo"], watcher.poll())
+        package = loader.find(PackageRequest("foo"))
+        self.assertEqual("foo-2", package.qualified_name)
+
+    def test_watcher_polling(self):
+        self._test_watcher(polling=True)
+
+    @unittest.skipUnless(os.path.exists("/proc/sys/fs/inotify"),
+                         "inotify not available")
+    def test_watcher_inotify(self):
+        self._test_watcher(polling=False)
+
+    @unittest.skipUnless(os.path.exists("/proc/sys/fs/inotify"),
+                         "inotify not available")
+    def test_watcher_inotify_unwatch(self):
+        self.dev_repo.add("foo", version="1")
+        self.dev_repo.add("bar", version="1")
+        foo_dir = os.path.join(self.dev_repo_path, "foo")
+        bar_dir = os.path.join(self.dev_repo_path, "bar")
+
+        loader = PackageLoader()
+        loader.find(PackageRequest("foo"))
+        loader.find(PackageRequest("bar"))
+
+        watcher = LoaderWatcher(loader)
+        self.addCleanup(watcher.close)
+        watcher.sync()
+        inotify = watcher._inotify
+
+        def kernel_watches():
+            with open("/proc/self/fdinfo/%d" % inotify._fd) as f:
+                return sum(line.startswith("inotify") for line in f)
+
+        self.assertEqual({foo_dir, os.path.join(foo_dir, "1"),
+                          bar_dir, os.path.join(bar_dir, "1")},
+                         inotify.watched())
+        self.assertEqual(4, kernel_watches())
+
+        # family directory deleted
+        shutil.rmtree(bar_dir)
+        self.assertEqual(["bar"], watcher.poll())
+        self.assertEqual({foo_dir, os.path.join(foo_dir, "1")},
+                         inotify.watched())
+        self.assertEqual(2, kernel_watches())
+
+        # family directory renamed
+        os.rename(foo_dir, foo_dir + "-old")
+        self.assertEqual(["foo"], watcher.poll())
+        self.assertEqual(set(), inotify.watched())
+        self.assertEqual(0, kernel_watches())
+
+        # watched again once re-loaded
+        shutil.copytree(foo_dir + "-old", foo_dir)
+        loader.find(PackageRequest("foo"))
+        watcher.sync()
+        self.assertEqual({foo_dir, os.path.join(foo_dir, "1")},
+                         inotify.watched())
+        self.assertEqual(2, kernel_watches())
+
+    def _make_remote(self, name, tags):
+        # a local bare repository that stands in for the remote
+        work = os.path.join(self.root, "git", name)
+        remote = os.path.join(self.root, "git", name + ".git")
+        os.makedirs(work)
+
+        def git(*args, cwd=work):
+            identity = ["-c", "user.name=test", "-c", "user.email=test@test"]
+            subprocess.check_call(["git"] + identity + list(args), cwd=cwd,
+                                  stdout=subprocess.DEVNULL,
+                                  stderr=subprocess.DEVNULL)
+
+        git("init")
+        git("commit", "--allow-empty", "-m", "init")
+        for tag in tags:
+            git("tag", "-a", tag, "-m", tag)
+        git("clone", "--bare", work, remote, cwd=self.root)
+
+        return remote
+
+    def _add_git_versioned(self, name, git_url):
+        @early()
+        def version():
+            import os
+            return os.getenv("REZ_DELIVER_PKG_PAYLOAD_VER", "unknown")
+
+        self.dev_repo.add(name, version=version, git_url=git_url)
+
+    def _finish_compat_package(self):
+        # a package that exercises what `from_path` does after loading
+        @early()
+        def version():
+            import os
+            return os.getenv("REZ_DELIVER_PKG_PAYLOAD_VER", "unknown")
+
+        @early()
+        def tools():
+            return ["early-bound"]
+
+        def preprocess(this, data):
+            data["description"] = "preprocessed"
+
+        settings = dict(PackageLoader().settings,
+                        package_preprocess_function=preprocess)
+        self.dev_repo.add("foo", version="1")
+        self.dev_repo.add("bar",
+                          version=version,
+                          git_url=".../davidlatwe/bar.git",
+                          tools=tools,
+                          requires=["foo-*"])
+
+        dirpath = os.path.join(self.dev_repo_path, "bar")
+        filepath = os.path.join(dirpath, "package.py")
+        with override_config(settings), os_chdir(dirpath), \
+                temp_env("REZ_DELIVER_PKG_PAYLOAD_VER", "1.2.0"):
+            expected = DeveloperPackage.from_path(dirpath)
+            definition = _rezcompat.load_package_file(filepath)
+            package = _rezcompat.developer_package(filepath, definition)
+            prober = _rezcompat.version_prober(filepath)
+
+        return expected, package, prober
+
+    def test_rezcompat_finish_package(self):
+        # pins behaviour of rez private parts that `_rezcompat` relies on
+        expected, package, prober = self._finish_compat_package()
+
+        self.assertEqual(expected.data, package.data)
+        self.assertEqual("bar-1.2.0", package.qualified_name)
+        self.assertEqual(["foo-1"], [str(r) for r in package.requires])
+        self.assertEqual(["early-bound"], package.tools)
+        self.assertEqual("preprocessed", package.description)
+        self.assertEqual("1.2.0", prober("1.2.0"))
+
+    def test_rezcompat_unsupported(self):
+        with patch.object(_rezcompat, "SUPPORTED", False):
+            expected, package, prober = self._finish_compat_package()
+
+        # finished by `from_path`, version not probed
+        self.assertEqual(expected.data, package.data)
+        self.assertIsNone(prober("1.2.0"))
+
+    @patch.object(DevPkgRepo, "_git_tags",
+                  return_value=["1.0.0", "1.1.0", "1.2.0"])
+    def test_lazy_git_versioned_package(self, _):
+        self._add_git_versioned("bar", ".../davidlatwe/bar.git")
+        loader = PackageLoader()
+
+        with patch.object(_rezcompat, "load_package_file",
+                          wraps=_rezcompat.load_package_file) as mock:
+            versions = [str(p.version) for p in loader.iter_packages("bar")]
+            self.assertEqual(["1.0.0", "1.1.0", "1.2.0"], sorted(versions))
+            mock.assert_not_called()
+
+            package = loader.find(PackageRequest("bar"))
+            self.assertEqual("bar-1.2.0", package.qualified_name)
+            self.assertEqual("1.2.0", package.data["__ver_tag__"])
+            self.assertEqual(1, mock.call_count)
+
+    @patch.object(DevPkgRepo, "_git_tags", return_value=["1.0.0", "1.1.0"])
+    def test_lazy_git_versioned_wildcard_requires(self, _):
+        self.dev_repo.add("foo", version="1")
+
+        @early()
+        def version():
+            import os
+            return os.getenv("REZ_DELIVER_PKG_PAYLOAD_VER", "unknown")
+
+        self.dev_repo.add("bar", version=version, git_url=".../bar.git",
+                          requires=["foo-*", "os-*"])
+        loader = PackageLoader()
+
+        # deferred data is read outside of loader config
+        package = loader.find(PackageRequest("bar"))
+        self.assertEqual("bar-1.1.0", package.qualified_name)
+        self.assertEqual("foo-1", str(package.requires[0]))
+
+    @patch.object(DevPkgRepo, "_git_tags", return_value=["1.0.0"])
+    def test_lazy_git_versioned_probe_mismatch(self, _):
+        self._add_git_versioned("bar", ".../davidlatwe/bar.git")
+        loader = PackageLoader()
+
+        with patch.object(DevPkgRepo, "_version_prober",
+                          return_value=lambda _: "9.9.9"):
+            package = loader.find(PackageRequest("bar"))
+            with self.assertRaises(RezDeliverFatalError):
+                package.validate_data()
+
+    @unittest.skipIf(shutil.which("git") is None, "git not found")
+    def test_prefetch_git_tags(self):
+        self._update_deliver_settings(
+            cache_root=os.path.join(self.root, "cache"),
+            git_tags_ttl=0,
+        )
+        self._add_git_versioned("foo", self._make_remote("foo", ["1.0.0"]))
+        self._add_git_versioned("bar", self._make_remote("bar", ["0.1", "0.2"]))
+        self.dev_repo.add("egg", version="1")
+
+        # git urls are known once packages have been loaded
+        loader = PackageLoader()
+        for name in ("foo", "bar", "egg"):
+            list(loader.iter_packages(name))
+
+        # new session, tags are expired
+        package_repository_manager.clear_caches()
+        PackageLoader.clear_instance()
+        loader = PackageLoader()
+        loader.prefetch_git_tags()
+
+        with patch.object(DevPkgRepo, "_git_tags") as mock_git_tags:
+            versions = [str(p.version) for p in loader.iter_packages("bar")]
+            self.assertEqual(["0.1", "0.2"], sorted(versions))
+            versions = [str(p.version) for p in loader.iter_packages("foo")]
+            self.assertEqual(["1.0.0"], versions)
+
+            mock_git_tags.assert_not_called()
+
+    @patch.object(DevPkgRepo, "_git_tags", return_value=["1.0.0"])
+    def test_prefetch_git_tags_not_loading(self, mock_git_tags):
+        self._add_git_versioned("foo", ".../davidlatwe/foo.git")
+        broken = os.path.join(self.dev_repo_path, "broken", "1")
+        os.makedirs(broken)
+        with open(os.path.join(broken, "package.py"), "w") as f:
+            f.write("name = 'broken'\nversion = '1'\nraise ValueError()\n")
+
+        # package definition files are not executed for prefetching
+        loader = PackageLoader()
+        loader.prefetch_git_tags()
+        mock_git_tags.assert_not_called()
+
+        package = loader.find(PackageRequest("foo"))
+        self.assertEqual("foo-1.0.0", package.qualified_name)
+
+    @patch.object(DevPkgRepo, "_git_tags", return_value=["1.0.0"])
+    def test_iter_dev_packages_prefetch_git_tags(self, _):
+        self._add_git_versioned("foo", ".../davidlatwe/foo.git")
+        self.dev_repo.add("bar", version="1")
+
+        repo = self._dev_repo(PackageLoader())
+        with patch.object(DevPkgRepo, "prefetch_git_tags",
+                          wraps=repo.prefetch_git_tags) as mock:
+            names = [name for name, _ in repo.iter_dev_packages()]
+            self.assertEqual(["bar", "foo"], sorted(names))
+            mock.assert_called_once_with()
+
+    @unittest.skipIf(shutil.which("git") is None, "git not found")
+    def test_prefetch_git_tags_unreachable(self):
+        missing = os.path.join(self.root, "git", "missing.git")
+        self._add_git_versioned("foo", missing)
+        self._add_git_versioned("bar", self._make_remote("bar", ["0.1"]))
+
+        loader = PackageLoader()
+        loader.prefetch_git_tags()
+
+        self.assertEqual([], list(loader.iter_packages("foo")))
+        self.assertEqual(1, len(list(loader.iter_packages("bar"))))
+
+
+if __name__ == "__main__":
+    unittest.main()
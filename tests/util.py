@@ -1,25 +1,71 @@
 
 import os
+import time
+import shutil
+import tempfile
 import unittest
 import functools
 from contextlib import contextmanager
+from deliver.api import PackageLoader
 from deliver.lib import temp_env
 from rez.utils.yaml import save_yaml
 from rez.config import config, _create_locked_config
+from tests.ghostwriter import DeveloperRepository
 
 
 class TestBase(unittest.TestCase):
+    """Test case with temporary developer and install package repositories
 
-    @classmethod
-    def setUpClass(cls):
-        cls.settings = {}
+    Config `settings` and rez-deliver `deliver_settings` can be extended in
+    `update_settings`, before config is set up.
+
+    """
 
     def setUp(self):
+        root = tempfile.mkdtemp(prefix="rez_deliver_test_")
+        self.root = root
+        self.install_path = os.path.join(root, "install")
+        self.dev_repo_path = os.path.join(root, "developer")
+        self.dev_repo = DeveloperRepository(self.dev_repo_path)
+        self.deliver_settings = {
+            "dev_repository_roots": [self.dev_repo_path],
+            # no persistent cache unless test asks for it
+            "cache_root": None,
+        }
+        self.settings = {
+            "packages_path": [self.install_path],
+            "local_packages_path": self.install_path,
+            "plugins": {
+                "command": {"deliver": self.deliver_settings}
+            }
+        }
+        self.update_settings()
         # shield unit tests from any user config overrides
         self.setup_config()
+        PackageLoader.clear_instance()
 
     def tearDown(self):
         self.teardown_config()
+        PackageLoader.clear_instance()
+
+        retries = 5
+        for i in range(retries):
+            try:
+                shutil.rmtree(self.root)
+                break
+            except FileNotFoundError:
+                break
+            except Exception:
+                if i < (retries - 1):
+                    time.sleep(0.2)
+
+    def update_settings(self):
+        pass
+
+    def _update_deliver_settings(self, **kwargs):
+        self.teardown_config()
+        self.deliver_settings.update(kwargs)
+        self.setup_config()
 
     def setup_config(self):
         # to make sure config changes from one test don't affect another, copy